@@ -1,5 +1,9 @@
 import json
+import random
+import time
+import uuid
 from pathlib import Path
+from urllib.parse import urlencode
 
 import requests
 from requests import RequestException
@@ -7,32 +11,63 @@ from requests import RequestException
 
 BASE_URL = "http://127.0.0.1:8000/api"
 TOKEN_FILE = Path(".token_cache")
+HTTP_CACHE_FILE = Path(".http_cache")
 DEFAULT_TIMEOUT = 10
+ORDER_RETRIES = 3
+RETRY_BACKOFF = 0.5
 
 class ApiService:
-    def __init__(self):
+    def __init__(self, base_url=BASE_URL, token_file=TOKEN_FILE, http_cache_file=HTTP_CACHE_FILE):
+        # Passing None for either file keeps that state in memory only, so
+        # several services (e.g. simulated users) can run side by side.
+        self.base_url = base_url.rstrip("/")
+        self.token_file = token_file
+        self.http_cache_file = http_cache_file
         self.session = requests.Session()
         self.access_token = self.load_token()
+        self.http_cache = self.load_http_cache()
 
     def load_token(self):
-        if TOKEN_FILE.exists():
+        if self.token_file and self.token_file.exists():
             try:
-                data = json.loads(TOKEN_FILE.read_text())
+                data = json.loads(self.token_file.read_text())
                 return data.get("access")
             except (json.JSONDecodeError, OSError):
                 return None
         return None
 
     def save_token(self, tokens):
-        TOKEN_FILE.write_text(json.dumps(tokens), encoding="utf-8")
+        if self.token_file:
+            self.token_file.write_text(json.dumps(tokens), encoding="utf-8")
         self.access_token = tokens.get("access")
 
+    def load_http_cache(self):
+        if self.http_cache_file and self.http_cache_file.exists():
+            try:
+                return json.loads(self.http_cache_file.read_text())
+            except (json.JSONDecodeError, OSError):
+                return {}
+        return {}
+
+    def save_http_cache(self):
+        if not self.http_cache_file:
+            return
+        try:
+            self.http_cache_file.write_text(json.dumps(self.http_cache), encoding="utf-8")
+        except OSError:
+            pass
+
+    def _url(self, endpoint):
+        if endpoint.startswith(("http://", "https://")):
+            return endpoint
+        return f"{self.base_url}/{endpoint}"
+
     def _request(self, method, endpoint, **kwargs):
         kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
         if 'headers' not in kwargs:
             kwargs['headers'] = self._get_headers()
         try:
-            response = self.session.request(method, f"{BASE_URL}/{endpoint}", **kwargs)
+            response = self.session.request(method, self._url(endpoint), **kwargs)
             return response, None
         except RequestException as exc:
             return None, str(exc)
@@ -60,11 +95,48 @@ class ApiService:
     def _get_headers(self):
         return {"Authorization": f"Bearer {self.access_token}"} if self.access_token else {}
 
-    def get_restaurants(self):
-        response, error = self._request("get", "restaurants/")
-        if error or response.status_code != 200:
-            return []
-        return response.json()
+    def _get_json(self, endpoint, params=None):
+        """GET a JSON body, revalidating any locally stored copy with its ETag."""
+        url = self._url(endpoint)
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        headers = self._get_headers()
+        cached = self.http_cache.get(url)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+
+        response, error = self._request("get", url, headers=headers)
+        if error:
+            return None
+        if response.status_code == 304 and cached:
+            return cached["body"]
+        if response.status_code != 200:
+            return None
+        body = response.json()
+        if "ETag" in response.headers:
+            self.http_cache[url] = {"etag": response.headers["ETag"], "body": body}
+            self.save_http_cache()
+        return body
+
+    def _iter_pages(self, endpoint, params=None):
+        """Yield results lazily, following the server's opaque `next` cursors."""
+        data = self._get_json(endpoint, params=params)
+        while data is not None:
+            yield from data.get("results", [])
+            if not data.get("next"):
+                return
+            data = self._get_json(data["next"])
+
+    def iter_restaurants(self, with_menus=False):
+        if with_menus:
+            return self._iter_pages("restaurants/", params={"expand": "menu_items"})
+        return self._iter_pages("restaurants/", params={"fields": "id,name,cuisine,description"})
+
+    def get_restaurants(self, with_menus=False):
+        return list(self.iter_restaurants(with_menus=with_menus))
+
+    def get_menu(self, restaurant_id):
+        return self._get_json(f"restaurants/{restaurant_id}/menu/")
 
     def get_my_profile(self):
         response, error = self._request("get", "profile/me/")
@@ -72,34 +144,62 @@ class ApiService:
             return None
         return response.json()
 
-    def create_order(self, items):
-        # items is {id: quantity}
-        response, error = self._request("post", "orders/", json={"items": items})
+    def create_order(self, items, idempotency_key=None):
+        # items is {id: quantity}. One key per checkout makes retries after a
+        # timeout safe: the server replays the first order instead of adding one.
+        headers = {**self._get_headers(), "Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        for attempt in range(ORDER_RETRIES + 1):
+            response, error = self._request("post", "orders/", json={"items": items}, headers=headers)
+            if not error and response.status_code < 500:
+                return response.json(), response.status_code
+            if attempt < ORDER_RETRIES:
+                time.sleep(RETRY_BACKOFF * 2 ** attempt + random.uniform(0, RETRY_BACKOFF))
         if error:
             return {"error": error}, 0
-        return response.json(), response.status_code
+        return {"error": response.text}, response.status_code
+
+    def iter_orders(self):
+        return self._iter_pages("orders/")
 
     def get_orders(self):
-        response, error = self._request("get", "orders/")
-        if error or response.status_code != 200:
-            return []
-        return response.json()
+        return list(self.iter_orders())
+
+    def confirm_receipt(self, order_id):
+        response, error = self._request("post", f"orders/{order_id}/confirm_receipt/")
+        return bool(response and not error and response.status_code == 200)
 
     def cancel_order(self, order_id):
         response, error = self._request("post", f"orders/{order_id}/cancel/")
         return bool(response and not error and response.status_code == 200)
 
     # Driver Methods
+    def iter_available_jobs(self):
+        return self._iter_pages("orders/available_jobs/")
+
     def get_available_jobs(self):
-        response, error = self._request("get", "orders/available_jobs/")
-        if error or response.status_code != 200:
-            return []
-        return response.json()
+        return list(self.iter_available_jobs())
 
     def accept_job(self, order_id):
         response, error = self._request("post", f"orders/{order_id}/accept_job/")
         return bool(response and not error and response.status_code == 200)
 
+    def claim_next_job(self):
+        response, error = self._request("post", "orders/claim_next_job/")
+        if error or response.status_code != 200:
+            return None
+        return response.json()
+
+    def get_job_offers(self):
+        return list(self._iter_pages("orders/offers/"))
+
+    def decline_offer(self, order_id):
+        response, error = self._request("post", f"orders/{order_id}/decline_offer/")
+        return bool(response and not error and response.status_code == 200)
+
+    def set_availability(self, is_available):
+        response, error = self._request("post", "profile/availability/", json={"is_available": is_available})
+        return bool(response and not error and response.status_code == 200)
+
     def complete_job(self, order_id):
         response, error = self._request("post", f"orders/{order_id}/complete_job/")
         return bool(response and not error and response.status_code == 200)
@@ -124,3 +224,30 @@ class ApiService:
             return True, data.get("message", "Verified")
         return False, data.get("message", "Invalid OTP")
 
+    # Live updates
+    def stream_order_events(self):
+        """Yield order events from the server's SSE feed until the connection drops."""
+        try:
+            response = self.session.get(
+                self._url("events/orders/"),
+                headers={**self._get_headers(), "Accept": "text/event-stream"},
+                stream=True,
+                timeout=(DEFAULT_TIMEOUT, None),
+            )
+        except RequestException:
+            return
+        if response.status_code != 200:
+            response.close()
+            return
+
+        with response:
+            data_lines = []
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("data:"):
+                        data_lines.append(line[5:].strip())
+                    elif not line and data_lines:
+                        yield json.loads("\n".join(data_lines))
+                        data_lines = []
+            except RequestException:
+                return
@@ -102,7 +102,10 @@ def display_menu(restaurant_name, menu_items):
     console.print(table)
 
 def display_orders(orders):
-    table = Table(title="Your Orders", box=box.MINIMAL)
+    console.print(orders_table(orders))
+
+def orders_table(orders, title="Your Orders"):
+    table = Table(title=title, box=box.MINIMAL)
     table.add_column("ID", style="cyan")
     table.add_column("Restaurant", style="blue")
     table.add_column("Status", style="bold")
@@ -120,7 +123,7 @@ def display_orders(orders):
             f"${o['total_price']}", 
             o['created_at'][:10]
         )
-    console.print(table)
+    return table
 
 def display_available_jobs(orders):
     table = Table(title="Available Deliveries", box=box.HEAVY)
@@ -1,12 +1,24 @@
 from django.db import transaction
-from django.db.models import Q, Prefetch
-from rest_framework import viewsets, status, permissions, generics
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework import viewsets, status, permissions, generics, serializers
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.contrib.auth.models import User
-from .models import Restaurant, Order, OrderItem
-from .serializers import RestaurantSerializer, OrderSerializer, CreateOrderSerializer, UserProfileSerializer, UserSerializer, UserRegistrationSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from .models import Restaurant, MenuItem, Order, OrderItem, UserProfile, profile_tag
+from .serializers import RestaurantSerializer, OrderSerializer, CreateOrderSerializer, UserProfileSerializer, UserSerializer, UserRegistrationSerializer, requested_fieldset, resolve_field_names
+from . import fast_serializers, order_states
+from .events import order_changed
+from .dispatch import decline_offer, offered_to_someone_else
+from .pagination import OrderCursorPagination, RestaurantCursorPagination
+from .caching import cached, invalidate_tags
+from .catalog import catalog_cached
+from .idempotency import IDEMPOTENCY_HEADER, run_idempotent
+from .outbox import enqueue_email
+from .authentication import get_profile_id, get_role, tokens_for
+from .permissions import IsDriver
+from .throttling import LoginIPThrottle, LoginUsernameThrottle, OTPEmailThrottle, OTPIPThrottle, OTPVerifyEmailThrottle
+from rest_framework_simplejwt.views import TokenObtainPairView
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -19,11 +31,7 @@ class RegisterView(generics.CreateAPIView):
             user = serializer.save()
             
 
-            refresh = RefreshToken.for_user(user)
-            tokens = {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
+            tokens = tokens_for(user)
             
             return Response({
                 'user': UserSerializer(user).data,
@@ -32,104 +40,171 @@ class RegisterView(generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class RestaurantViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Restaurant.objects.prefetch_related('menu_items').all()
+    queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RestaurantCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = requested_fieldset(self.request)
+        if 'menu_items' in resolve_field_names(RestaurantSerializer.Meta.fields, RestaurantSerializer.Meta.expandable_fields, fields, expand):
+            queryset = queryset.prefetch_related(Prefetch('menu_items', queryset=MenuItem.objects.order_by('id')))
+        return queryset
+
+    @catalog_cached
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(fast_serializers.restaurant_rows(queryset))
+        fields, expand = requested_fieldset(request)
+        return self.get_paginated_response(fast_serializers.serialize_restaurants(page, request, fields, expand))
+
+    @catalog_cached
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=True, methods=['get'])
+    @catalog_cached
+    def menu(self, request, pk=None):
+        restaurant = self.get_object()
+        serializer = self.get_serializer(restaurant, fields=['id', 'name'], expand=['menu_items'])
+        return Response(serializer.data)
 
 class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderCursorPagination
+    lookup_value_regex = '[0-9]+'
+
+    def get_base_queryset(self):
+        return Order.objects.select_related('user', 'driver', 'restaurant').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('menu_item').order_by('id'))
+        )
 
     def get_queryset(self):
         user = self.request.user
-        base_qs = Order.objects.select_related('user', 'driver').prefetch_related(
-            Prefetch('items', queryset=OrderItem.objects.select_related('menu_item__restaurant'))
-        )
+        base_qs = self.get_base_queryset()
 
-        if hasattr(user, 'userprofile') and user.userprofile.role == 'Driver':
-            return base_qs.filter(Q(driver=user) | Q(driver__isnull=True, status='Pending')).order_by('-created_at').distinct()
+        if get_role(user) == 'Driver':
+            # Two independently indexed scans glued with UNION; an OR across
+            # both shapes forces a full scan plus DISTINCT on large tables.
+            visible_ids = Order.objects.filter(driver=user).values('id').union(
+                Order.objects.filter(driver__isnull=True, status='Pending').values('id')
+            )
+            return base_qs.filter(id__in=visible_ids).order_by('-created_at')
 
         return base_qs.filter(user=user).order_by('-created_at')
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(fast_serializers.order_rows(queryset))
+        return self.get_paginated_response(fast_serializers.serialize_orders(page))
+
     def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key:
+            return run_idempotent(request, key, lambda: self.create_order(request))
+        return self.create_order(request)
+
+    def create_order(self, request):
         serializer = CreateOrderSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         order = serializer.save()
+        order_changed(order.id, open_jobs=True)
         return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
 
+    def transition_failed(self, message):
+        # Only reached when the conditional update missed; tell "not yours"
+        # apart from "wrong state" without reading the row up front.
+        self.get_object()
+        return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
-        order = self.get_object()
-        if order.status == 'Pending':
-            order.status = 'Cancelled'
-            order.save()
+        if order_states.cancel(pk, request.user):
             return Response({'status': 'Order cancelled'})
-        return Response({'error': 'Cannot cancel order'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.transition_failed('Cannot cancel order')
 
     @action(detail=True, methods=['post'])
     def confirm_receipt(self, request, pk=None):
-        order = self.get_object()
-        if order.user == request.user:
-            order.customer_confirmed = True
-            order.save()
-
-            if order.driver_confirmed:
-                order.status = 'Delivered'
-                order.save()
+        if order_states.customer_confirm(pk, request.user):
             return Response({'status': 'Receipt confirmed'})
-        return Response({'error': 'Not your order'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.transition_failed('Not your order')
 
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], permission_classes=[IsDriver])
     def available_jobs(self, request):
-        if not hasattr(request.user, 'userprofile') or request.user.userprofile.role != 'Driver':
-            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
-        orders = Order.objects.filter(status='Pending', driver=None)
-        serializer = self.get_serializer(orders, many=True)
-        return Response(serializer.data)
+        orders = self.get_base_queryset().filter(~offered_to_someone_else(request.user), status='Pending', driver=None)
+        page = self.paginate_queryset(fast_serializers.order_rows(orders))
+        return self.get_paginated_response(fast_serializers.serialize_orders(page))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsDriver])
+    def offers(self, request):
+        orders = self.get_base_queryset().filter(
+            offers__driver=request.user, offers__status='Offered', offers__expires_at__gt=timezone.now(),
+            status='Pending', driver__isnull=True,
+        )
+        page = self.paginate_queryset(fast_serializers.order_rows(orders))
+        return self.get_paginated_response(fast_serializers.serialize_orders(page))
 
-    @action(detail=True, methods=['post'])
-    def accept_job(self, request, pk=None):
-        if not hasattr(request.user, 'userprofile') or request.user.userprofile.role != 'Driver':
-            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
-        with transaction.atomic():
-            order = self.get_object()
-            updated = Order.objects.filter(id=order.id, status='Pending', driver__isnull=True).update(
-                driver=request.user,
-                status='Delivering'
-            )
+    @action(detail=True, methods=['post'], permission_classes=[IsDriver])
+    def decline_offer(self, request, pk=None):
+        if decline_offer(pk, request.user):
+            return Response({'status': 'Offer declined'})
+        return Response({'error': 'No open offer'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if updated:
+    @action(detail=True, methods=['post'], permission_classes=[IsDriver])
+    def accept_job(self, request, pk=None):
+        if order_states.accept(pk, request.user):
             return Response({'status': 'Job accepted'})
-        return Response({'error': 'Job not available'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.transition_failed('Job not available')
 
-    @action(detail=True, methods=['post'])
+    @action(detail=False, methods=['post'], permission_classes=[IsDriver])
+    def claim_next_job(self, request):
+        order_id = order_states.claim_next(request.user)
+        if order_id is None:
+            return Response({'error': 'No jobs available'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(OrderSerializer(self.get_base_queryset().get(id=order_id)).data)
+
+    @action(detail=True, methods=['post'], permission_classes=[IsDriver])
     def complete_job(self, request, pk=None):
-        if not hasattr(request.user, 'userprofile') or request.user.userprofile.role != 'Driver':
-            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
-        order = self.get_object()
-        if order.driver == request.user:
-            order.driver_confirmed = True
-            order.save()
-            if order.customer_confirmed:
-                order.status = 'Delivered'
-                order.save()
+        if order_states.driver_confirm(pk, request.user):
             return Response({'status': 'Job marked as completed'})
-        return Response({'error': 'Not your job'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.transition_failed('Not your job')
+
+PROFILE_TTL = 10 * 60
+
+@cached(ttl=PROFILE_TTL, key=lambda user_id: f'profile:{user_id}', tags=lambda user_id: [profile_tag(user_id)])
+def profile_data(user_id):
+    # Loads the user row too: with claim-based auth request.user is only an id.
+    profile = UserProfile.objects.select_related('user').get(user_id=user_id)
+    return dict(UserProfileSerializer(profile).data)
 
 class UserProfileViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     @action(detail=False, methods=['get'])
     def me(self, request):
-        serializer = UserProfileSerializer(request.user.userprofile)
-        return Response(serializer.data)
+        return Response(profile_data(request.user.id))
+
+    @action(detail=False, methods=['post'], permission_classes=[IsDriver])
+    def availability(self, request):
+        """Drivers go on or off shift for the dispatcher."""
+        is_available = serializers.BooleanField().to_internal_value(request.data.get('is_available'))
+        UserProfile.objects.filter(id=get_profile_id(request.user)).update(is_available=is_available)
+        invalidate_tags(profile_tag(request.user.id))
+        return Response({'is_available': is_available})
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """Token endpoint limited per IP and per username before any password hashing"""
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
 
 class SendOTPView(generics.GenericAPIView):
     """Send OTP to email for verification"""
     permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = [OTPIPThrottle, OTPEmailThrottle]
     
     def post(self, request):
-        from django.core.mail import send_mail
         from django.utils import timezone
         from datetime import timedelta
         import random
@@ -142,22 +217,22 @@ class SendOTPView(generics.GenericAPIView):
 
         otp_code = str(random.randint(100000, 999999))
         
+        # The code and its email commit together; send_outbox delivers it, so
+        # this request never waits on the SMTP server.
+        with transaction.atomic():
+            EmailOTP.objects.filter(email=email, is_verified=False).delete()
 
-        EmailOTP.objects.filter(email=email, is_verified=False).delete()
-        
-
-        expires_at = timezone.now() + timedelta(minutes=5)
-        EmailOTP.objects.create(
-            email=email,
-            otp_code=otp_code,
-            expires_at=expires_at
-        )
-        
+            expires_at = timezone.now() + timedelta(minutes=5)
+            EmailOTP.objects.create(
+                email=email,
+                otp_code=otp_code,
+                expires_at=expires_at
+            )
 
-        try:
-            send_mail(
+            enqueue_email(
+                to_email=email,
                 subject='Your Mostafa Verification Code',
-                message=f'''Hi there!
+                body=f'''Hi there!
 
 Your verification code is: {otp_code}
 
@@ -168,22 +243,18 @@ If you didn't request this code, please ignore this email.
 Thanks,
 Mostafa Team''',
                 from_email='noreply@fooddelivery.com',
-                recipient_list=[email],
-                fail_silently=False,
             )
-            
-            return Response({
-                'message': 'OTP sent successfully',
-                'email': email
-            }, status=status.HTTP_200_OK)
-        except Exception as e:
-            return Response({
-                'error': f'Failed to send email: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({
+            'message': 'OTP sent successfully',
+            'email': email
+        }, status=status.HTTP_200_OK)
 
 class VerifyOTPView(generics.GenericAPIView):
     """Verify OTP code"""
     permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = [OTPIPThrottle, OTPVerifyEmailThrottle]
     
     def post(self, request):
         from .models import EmailOTP
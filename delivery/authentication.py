@@ -0,0 +1,93 @@
+"""JWT access tokens that carry the caller's role and profile id.
+
+Access tokens issued by `DeliveryTokenObtainPairSerializer` (login),
+`DeliveryTokenRefreshSerializer` (refresh) and `tokens_for` (registration)
+include ``role`` and ``profile_id`` claims. `ClaimsJWTAuthentication` trusts
+those signed claims and hands views an unsaved ``User(id=...)`` instead of
+loading the row, so role checks cost no queries. Refresh tokens carry no
+claims: every refresh re-reads the profile and refuses inactive users, so a
+role change or deactivation takes effect when the user's current access token
+expires, not immediately. Tokens without the claims (issued before they
+existed) are authenticated the usual way.
+"""
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+ROLE_CLAIM = 'role'
+PROFILE_CLAIM = 'profile_id'
+
+
+def access_token_for(refresh, user):
+    """Access token from `refresh` with `user`'s current profile claims."""
+    access = refresh.access_token
+    profile = getattr(user, 'userprofile', None)
+    if profile is not None:
+        access[ROLE_CLAIM] = profile.role
+        access[PROFILE_CLAIM] = profile.id
+    else:
+        # Refresh tokens issued before the claims moved off them still carry them.
+        access.payload.pop(ROLE_CLAIM, None)
+        access.payload.pop(PROFILE_CLAIM, None)
+    return access
+
+
+def tokens_for(user):
+    """Refresh/access pair with profile claims, as returned by the login endpoint."""
+    refresh = RefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(access_token_for(refresh, user)),
+    }
+
+
+class DeliveryTokenObtainPairSerializer(TokenObtainPairSerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        data['access'] = str(access_token_for(RefreshToken(data['refresh']), self.user))
+        return data
+
+
+class DeliveryTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        # The parent refuses users that no longer pass the authentication rule.
+        data = super().validate(attrs)
+        user = User.objects.select_related('userprofile').get(
+            **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}
+        )
+        data['access'] = str(access_token_for(refresh, user))
+        return data
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token or PROFILE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        user = User(id=validated_token[api_settings.USER_ID_CLAIM])
+        # Mark it as loaded so it can be assigned to foreign keys and compared.
+        user._state.adding = False
+        user._state.db = 'default'
+        user.role = validated_token[ROLE_CLAIM]
+        user.profile_id = validated_token[PROFILE_CLAIM]
+        return user
+
+
+def get_role(user):
+    """The caller's role from token claims, falling back to the profile row."""
+    role = getattr(user, 'role', None)
+    if role is None:
+        profile = getattr(user, 'userprofile', None)
+        role = profile.role if profile is not None else None
+    return role
+
+
+def get_profile_id(user):
+    profile_id = getattr(user, 'profile_id', None)
+    if profile_id is None:
+        profile = getattr(user, 'userprofile', None)
+        profile_id = profile.id if profile is not None else None
+    return profile_id
@@ -0,0 +1,169 @@
+"""Shared cache helpers: TTLs, tag invalidation and single-flight recomputation.
+
+Entries can carry tags. The current version of each tag is folded into the
+entry's key, so invalidating a tag bumps its version and every entry built
+under the old one becomes unreachable and ages out on its TTL; nothing has to
+be enumerated or deleted.
+
+A miss is recomputed once rather than by every caller that sees it: threads in
+this process wait for the first one, and other processes wait on a short lock
+held in the shared cache and pick up the value it stores.
+"""
+import functools
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .db_router import use_primary
+
+DEFAULT_TTL = 5 * 60
+# Longest a recomputation may hold the cross-process lock before others give up on it.
+LOCK_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+
+MISSING = object()
+
+
+class SkipCache(Exception):
+    """Raised by a compute function to hand back `value` without caching it."""
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+def tag_key(tag):
+    return f'tag:{tag}'
+
+
+def tag_versions(tags):
+    """Current version of each tag, seeded from the clock so restarts never reuse one."""
+    keys = [tag_key(tag) for tag in tags]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump_tag(tag):
+    try:
+        cache.incr(tag_key(tag))
+    except ValueError:
+        tag_versions([tag])
+
+
+def invalidate_tags(*tags):
+    # Bump now so reads inside the writing transaction see fresh data, and
+    # again after commit so nobody keeps a copy built from pre-commit rows.
+    for tag in tags:
+        bump_tag(tag)
+    transaction.on_commit(lambda: [bump_tag(tag) for tag in tags])
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = MISSING
+        self.error = None
+        self.skipped = False
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _uncached(compute):
+    try:
+        return compute()
+    except SkipCache as exc:
+        return exc.value
+
+
+def _fill(key, compute, ttl):
+    lock_key = f'{key}:lock'
+    while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        # Another process is computing it; take its result rather than repeat
+        # the work. If it skips caching or dies, the lock goes away and the
+        # next add() succeeds.
+        time.sleep(POLL_INTERVAL)
+        value = cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+    try:
+        value = cache.get(key, MISSING)
+        if value is MISSING:
+            # Entries outlive replica lag, so build them from the primary.
+            with use_primary():
+                value = compute()
+            cache.set(key, value, ttl)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+def single_flight(key, compute, ttl):
+    """Compute and store `key` once, however many callers miss it at the same time."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leading = flight is None
+        if leading:
+            flight = _flights[key] = _Flight()
+
+    if not leading:
+        flight.done.wait()
+        if flight.skipped:
+            return _uncached(compute)
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        flight.value = _fill(key, compute, ttl)
+        return flight.value
+    except SkipCache as exc:
+        flight.skipped = True
+        return exc.value
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+def get_or_set(key, compute, ttl=DEFAULT_TTL, tags=()):
+    if tags:
+        key = f'{key}@' + '.'.join(str(version) for version in tag_versions(tags))
+    value = cache.get(key, MISSING)
+    if value is MISSING:
+        value = single_flight(key, compute, ttl)
+    return value
+
+
+def _digest(args, kwargs):
+    return hashlib.sha1(repr((args, sorted(kwargs.items()))).encode()).hexdigest()[:16]
+
+
+def cached(ttl=DEFAULT_TTL, tags=(), key=None):
+    """Cache a function's return value in the shared cache.
+
+    `key` and `tags` may be callables taking the function's arguments; by
+    default the key is the function's dotted name plus a digest of the
+    arguments, which must therefore have a stable repr.
+    """
+    def decorator(func):
+        prefix = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            name = key(*args, **kwargs) if key else f'{prefix}:{_digest(args, kwargs)}'
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            return get_or_set(name, lambda: func(*args, **kwargs), ttl, entry_tags)
+        return wrapper
+    return decorator
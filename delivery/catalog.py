@@ -0,0 +1,62 @@
+import functools
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .caching import SkipCache, bump_tag, get_or_set, invalidate_tags, tag_versions
+
+CATALOG_TAG = 'catalog'
+CATALOG_TIMEOUT = 60 * 60
+
+
+def get_catalog_version():
+    return tag_versions([CATALOG_TAG])[0]
+
+
+def bump_catalog_version():
+    bump_tag(CATALOG_TAG)
+
+
+def invalidate_catalog():
+    invalidate_tags(CATALOG_TAG)
+
+
+def catalog_cached(view_method):
+    """Serve a catalog view from the versioned cache with a strong ETag.
+
+    The cached payload is keyed by catalog version and the full request URL,
+    so any write to a restaurant or menu item makes every entry unreachable.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        version = get_catalog_version()
+        url = request.build_absolute_uri()
+        digest = hashlib.sha1(f'{url}|{request.accepted_media_type}'.encode()).hexdigest()[:16]
+        etag = quote_etag(f'{version}-{digest}')
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache_key = f'catalog:{version}:{digest}'
+        built = []
+
+        def build():
+            response = view_method(self, request, *args, **kwargs)
+            built.append(response)
+            if response.status_code != status.HTTP_200_OK:
+                raise SkipCache(response)
+            return response.data
+
+        # A cold catalog under load is rebuilt by one request; the rest wait for it.
+        data = get_or_set(cache_key, build, CATALOG_TIMEOUT)
+        response = built[0] if built else Response(data)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        for header, value in headers.items():
+            response[header] = value
+        return response
+    return wrapper
@@ -0,0 +1,76 @@
+"""Route safe reads to a read replica and everything else to the primary.
+
+`ReplicaRoutingMiddleware` picks one of ``settings.READ_REPLICAS`` for each
+GET/HEAD/OPTIONS request, and `ReplicaRouter` sends that request's reads to
+it. Writes, and every query made while handling other methods, go to the
+primary. A write also sets a short-lived cookie that keeps the client's reads
+on the primary for ``PRIMARY_PIN_SECONDS``, so an order list fetched right
+after creating an order includes it even if the replica lags behind.
+
+Code that must not read stale rows wraps itself in `use_primary()`; the
+shared cache does so when filling entries, since a copy built from a lagging
+replica would outlive the lag by the whole TTL.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+PRIMARY = 'default'
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_from = ContextVar('read_database', default=None)
+
+
+@contextmanager
+def read_from(alias):
+    """Route reads inside the block to `alias`; None means the primary."""
+    token = _read_from.set(alias)
+    try:
+        yield
+    finally:
+        _read_from.reset(token)
+
+
+def use_primary():
+    return read_from(None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_from.get() or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold copies of the primary's rows.
+        databases = {PRIMARY, *settings.READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication.
+        return db == PRIMARY
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        if not settings.READ_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = settings.READ_REPLICAS
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.PRIMARY_PIN_SECONDS, httponly=True, samesite='Lax')
+            return response
+
+        alias = random.choice(replicas) if PIN_COOKIE not in request.COOKIES else None
+        with read_from(alias):
+            return self.get_response(request)
@@ -0,0 +1,153 @@
+"""Driver dispatch: offer each pending order to one available driver at a time.
+
+`DispatchEngine` keeps a priority queue of unassigned orders and an ordered set
+of idle drivers in memory. Every tick it expires stale offers, picks up new
+orders and drivers, and pairs the most urgent order with the driver who has
+been waiting longest. A driver who declines or lets an offer lapse is not asked
+about the same order again while other drivers remain.
+"""
+import heapq
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import JobOffer, Order, UserProfile
+
+DEFAULT_OFFER_TIMEOUT = timedelta(seconds=30)
+
+
+def open_offers(now=None):
+    return JobOffer.objects.filter(status='Offered', expires_at__gt=now or timezone.now())
+
+
+def offered_to_someone_else(driver, now=None):
+    """Subquery flagging orders currently reserved for another driver."""
+    return Exists(open_offers(now).filter(order=OuterRef('pk')).exclude(driver=driver))
+
+
+class DispatchEngine:
+    def __init__(self, offer_timeout=DEFAULT_OFFER_TIMEOUT, age_weight=1.0, value_weight=1.0, clock=timezone.now):
+        self.offer_timeout = offer_timeout
+        self.age_weight = age_weight
+        self.value_weight = value_weight
+        self.clock = clock
+
+        self._queue = []
+        self._queued = set()
+        self._drivers = {}
+        self._passed = defaultdict(set)
+
+    def priority(self, created_at, total_price):
+        # Every queued order ages at the same rate, so ranking by creation time
+        # is the same as ranking by age and the heap never needs re-sorting.
+        # Each unit of value buys `value_weight` seconds of seniority.
+        return self.age_weight * created_at.timestamp() - self.value_weight * float(total_price)
+
+    def enqueue(self, order_id, created_at, total_price):
+        if order_id not in self._queued:
+            self._queued.add(order_id)
+            heapq.heappush(self._queue, (self.priority(created_at, total_price), order_id))
+
+    def expire_offers(self):
+        """Close lapsed offers; their orders are queued again on the next refresh."""
+        now = self.clock()
+        lapsed = list(
+            JobOffer.objects.filter(status='Offered', expires_at__lte=now)
+            .values_list('id', 'order_id', 'driver_id')
+        )
+        if lapsed:
+            JobOffer.objects.filter(id__in=[offer_id for offer_id, _, _ in lapsed], status='Offered').update(status='Expired')
+        for _, order_id, driver_id in lapsed:
+            self._passed[order_id].add(driver_id)
+        return len(lapsed)
+
+    def refresh(self):
+        """Load unassigned orders without an open offer and the current idle drivers."""
+        now = self.clock()
+        busy = open_offers(now)
+
+        offered_orders = set(busy.values_list('order_id', flat=True))
+        pending = Order.objects.filter(status='Pending', driver__isnull=True).values_list('id', 'created_at', 'total_price')
+        pending_ids = set()
+        for order_id, created_at, total_price in pending:
+            pending_ids.add(order_id)
+            if order_id not in offered_orders:
+                self.enqueue(order_id, created_at, total_price)
+        for order_id in set(self._passed) - pending_ids:
+            del self._passed[order_id]
+
+        declined = JobOffer.objects.filter(status='Declined', order__status='Pending', order__driver__isnull=True)
+        for order_id, driver_id in declined.values_list('order_id', 'driver_id'):
+            self._passed[order_id].add(driver_id)
+
+        available = set(
+            UserProfile.objects.filter(role='Driver', is_available=True).values_list('user_id', flat=True)
+        )
+        idle = available - set(busy.values_list('driver_id', flat=True))
+        # Dicts keep insertion order: drivers stay in the order they became idle.
+        self._drivers = {driver_id: None for driver_id in self._drivers if driver_id in idle}
+        self._drivers.update(dict.fromkeys(idle))
+
+        # Once every available driver has passed on an order, start a new round.
+        for order_id, passed in list(self._passed.items()):
+            if available <= passed:
+                del self._passed[order_id]
+
+    def pick_driver(self, order_id):
+        passed = self._passed.get(order_id, ())
+        return next((driver_id for driver_id in self._drivers if driver_id not in passed), None)
+
+    def offer(self, order_id, driver_id):
+        if not Order.objects.filter(id=order_id, status='Pending', driver__isnull=True).exists():
+            return False
+        try:
+            with transaction.atomic():
+                JobOffer.objects.create(order_id=order_id, driver_id=driver_id, expires_at=self.clock() + self.offer_timeout)
+        except IntegrityError:
+            return False
+        return True
+
+    def dispatch_once(self):
+        """Run one matching round and return the number of offers made."""
+        self.expire_offers()
+        self.refresh()
+
+        made = 0
+        waiting = []
+        while self._queue and self._drivers:
+            entry = heapq.heappop(self._queue)
+            order_id = entry[1]
+            driver_id = self.pick_driver(order_id)
+            if driver_id is None:
+                # Every idle driver already passed; wait for someone new.
+                waiting.append(entry)
+                continue
+            self._queued.discard(order_id)
+            if self.offer(order_id, driver_id):
+                del self._drivers[driver_id]
+                made += 1
+            else:
+                # Taken, cancelled or already offered elsewhere: drop it.
+                self._passed.pop(order_id, None)
+        for entry in waiting:
+            heapq.heappush(self._queue, entry)
+        return made
+
+    def run(self, interval=2.0, max_rounds=None):
+        """Yield the offers made per round, sleeping `interval` seconds between rounds."""
+        rounds = 0
+        while True:
+            yield self.dispatch_once()
+            rounds += 1
+            if max_rounds is not None and rounds >= max_rounds:
+                return
+            time.sleep(interval)
+
+
+def decline_offer(order_id, driver):
+    """Driver turns down their open offer; the engine re-offers the order next tick."""
+    return JobOffer.objects.filter(order_id=order_id, driver=driver, status='Offered').update(status='Declined') == 1
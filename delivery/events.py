@@ -0,0 +1,114 @@
+"""In-process publish/subscribe hub for order status changes.
+
+Publishers are ordinary sync Django code (views, order transitions); the
+subscribers are SSE streams running on the ASGI event loop. Events only reach
+streams served by the same process, so run one worker per stream host or put
+a shared broker behind `OrderEventHub.publish` when scaling out.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+SUBSCRIBER_QUEUE_SIZE = 100
+DRIVERS_CHANNEL = 'drivers'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+class Subscription:
+    def __init__(self, hub, channels, loop):
+        self.hub = hub
+        self.channels = list(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event):
+        # Runs on the subscriber's loop. A slow reader drops its oldest event
+        # rather than stalling publishers or growing without bound.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class OrderEventHub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, channels, loop=None):
+        subscription = Subscription(self, channels, loop or asyncio.get_running_loop())
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def publish(self, channels, event):
+        """Deliver `event` once to every subscription on any of `channels`; thread-safe."""
+        with self._lock:
+            targets = set()
+            for channel in channels:
+                targets.update(self._subscriptions.get(channel, ()))
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The subscriber's loop is already closed; its stream is gone.
+                self.unsubscribe(subscription)
+
+
+hub = OrderEventHub()
+
+
+def publish_order_change(order_id, open_jobs=False):
+    """Push the current state of an order to its customer and driver.
+
+    `open_jobs` also notifies every driver watching the job board, for changes
+    that add or remove an available job (creation, acceptance, cancellation).
+    """
+    from .fast_serializers import serialize_order_summary
+    from .models import Order
+
+    row = Order.objects.filter(id=order_id).values(
+        'id', 'user_id', 'driver_id', 'status', 'total_price', 'created_at', 'restaurant__name',
+    ).first()
+    if row is None:
+        return
+
+    channels = [user_channel(user_id) for user_id in (row['user_id'], row['driver_id']) if user_id is not None]
+    if open_jobs:
+        channels.append(DRIVERS_CHANNEL)
+    hub.publish(channels, serialize_order_summary(row))
+
+
+def order_changed(order_id, open_jobs=False):
+    """Schedule an event for `order_id` once the current transaction commits."""
+    if hub.has_subscribers():
+        transaction.on_commit(lambda: publish_order_change(order_id, open_jobs))
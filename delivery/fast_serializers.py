@@ -0,0 +1,108 @@
+"""Read-only list serialization built straight from `.values()` rows.
+
+The GET list endpoints spend most of their time instantiating DRF fields per
+row. These helpers fetch plain rows and map them to the exact payloads the
+ModelSerializers produce, reusing the serializers' own field converters so the
+formatting of decimals and datetimes cannot drift.
+"""
+from collections import defaultdict
+from functools import cache
+
+from .models import MenuItem, OrderItem
+from .serializers import MenuItemSerializer, OrderItemSerializer, OrderSerializer, RestaurantSerializer, resolve_field_names
+
+ORDER_VALUES = ('id', 'status', 'total_price', 'created_at', 'restaurant__name')
+ORDER_ITEM_VALUES = ('order_id', 'id', 'menu_item__name', 'quantity', 'price_at_time')
+RESTAURANT_FIELDS = tuple(RestaurantSerializer.Meta.fields)
+MENU_ITEM_VALUES = ('restaurant_id', 'id', 'name', 'description', 'price', 'image')
+
+
+@cache
+def _converters():
+    order_fields = OrderSerializer().fields
+    return {
+        'total_price': order_fields['total_price'].to_representation,
+        'created_at': order_fields['created_at'].to_representation,
+        'item_price': OrderItemSerializer().fields['price'].to_representation,
+        'menu_price': MenuItemSerializer().fields['price'].to_representation,
+        'image_url': MenuItem._meta.get_field('image').storage.url,
+    }
+
+
+def order_rows(queryset):
+    return queryset.prefetch_related(None).values(*ORDER_VALUES)
+
+
+def serialize_orders(rows):
+    """Payloads matching `OrderSerializer(many=True).data` for `order_rows()`."""
+    convert = _converters()
+    total_price, created_at, item_price = convert['total_price'], convert['created_at'], convert['item_price']
+
+    items_by_order = defaultdict(list)
+    items = OrderItem.objects.filter(order_id__in=[row['id'] for row in rows]).order_by('id')
+    for order_id, item_id, name, quantity, price in items.values_list(*ORDER_ITEM_VALUES):
+        items_by_order[order_id].append({
+            'id': item_id,
+            'menu_item_name': name,
+            'quantity': quantity,
+            'price': item_price(price),
+        })
+
+    return [
+        {
+            'id': row['id'],
+            'status': row['status'],
+            'total_price': total_price(row['total_price']),
+            'created_at': created_at(row['created_at']),
+            'items': items_by_order[row['id']],
+            'restaurant_name': row['restaurant__name'] if row['restaurant__name'] is not None else "Unknown",
+        }
+        for row in rows
+    ]
+
+
+def serialize_order_summary(row):
+    """An order payload without items, for rows carrying the `ORDER_VALUES` keys."""
+    convert = _converters()
+    return {
+        'id': row['id'],
+        'status': row['status'],
+        'total_price': convert['total_price'](row['total_price']),
+        'created_at': convert['created_at'](row['created_at']),
+        'restaurant_name': row['restaurant__name'] if row['restaurant__name'] is not None else "Unknown",
+    }
+
+
+def restaurant_rows(queryset):
+    # `id` is always fetched: cursors and menu grouping depend on it.
+    return queryset.prefetch_related(None).values(*[f for f in RESTAURANT_FIELDS if f != 'menu_items'])
+
+
+def serialize_restaurants(rows, request, fields=None, expand=None):
+    """Payloads matching `RestaurantSerializer(many=True).data` for `restaurant_rows()`."""
+    names = resolve_field_names(RESTAURANT_FIELDS, RestaurantSerializer.Meta.expandable_fields, fields, expand)
+    columns = [name for name in names if name != 'menu_items']
+
+    if 'menu_items' not in names:
+        return [{name: row[name] for name in columns} for row in rows]
+
+    convert = _converters()
+    menu_price, storage_url = convert['menu_price'], convert['image_url']
+    absolute = request.build_absolute_uri if request is not None else str
+    menus = defaultdict(list)
+    menu_items = MenuItem.objects.filter(restaurant_id__in=[row['id'] for row in rows]).order_by('id')
+    for restaurant_id, item_id, name, description, price, image in menu_items.values_list(*MENU_ITEM_VALUES):
+        menus[restaurant_id].append({
+            'id': item_id,
+            'name': name,
+            'description': description,
+            'price': menu_price(price),
+            'image': absolute(storage_url(image)) if image else None,
+        })
+
+    payloads = []
+    for row in rows:
+        payload = {name: row[name] for name in columns}
+        payload['menu_items'] = menus[row['id']]
+        payloads.append({name: payload[name] for name in names})
+    return payloads
@@ -0,0 +1,71 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_TTL = timedelta(hours=24)
+MAX_KEY_LENGTH = 64
+
+
+def request_hash(request):
+    payload = json.dumps(request.data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f'{request.method} {request.path} {payload}'.encode()).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored.request_hash != fingerprint:
+        return Response(
+            {'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored.response_body, status=stored.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+def _live_key(user, key):
+    return IdempotencyKey.objects.filter(user=user, key=key, expires_at__gt=timezone.now()).first()
+
+
+def run_idempotent(request, key, handler):
+    """Run `handler` once per (user, key); later calls replay its stored response.
+
+    The handler and the key row commit in one transaction, so a concurrent
+    duplicate either sees the stored row or loses on the unique constraint,
+    rolls back whatever it created and replays the winner's response.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    fingerprint = request_hash(request)
+    stored = _live_key(request.user, key)
+    if stored:
+        return _replay(stored, fingerprint)
+
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.filter(user=request.user, key=key, expires_at__lte=timezone.now()).delete()
+            response = handler()
+            if status.is_success(response.status_code):
+                IdempotencyKey.objects.create(
+                    user=request.user,
+                    key=key,
+                    request_hash=fingerprint,
+                    status_code=response.status_code,
+                    response_body=json.loads(json.dumps(response.data, default=str)),
+                    expires_at=timezone.now() + IDEMPOTENCY_TTL,
+                )
+    except IntegrityError:
+        stored = _live_key(request.user, key)
+        if stored is None:
+            raise
+        return _replay(stored, fingerprint)
+    return response
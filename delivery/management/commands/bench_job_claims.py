@@ -0,0 +1,105 @@
+import random
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from delivery import order_states
+from delivery.models import Order, UserProfile
+
+BENCH_PREFIX = 'bench_claims_'
+
+
+class Command(BaseCommand):
+    help = 'Compares claims per second of claim_next_job against the list-then-accept_job path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drivers', type=int, default=50, help='Concurrent driver threads')
+        parser.add_argument('--orders', type=int, default=2000, help='Pending orders per run')
+        parser.add_argument('--top', type=int, default=5, help='Jobs a driver looks at before picking one (accept path)')
+
+    def handle(self, *args, **options):
+        drivers = self.make_users(options['drivers'], 'Driver')
+        customer = self.make_users(1, 'Customer')[0]
+        failed = 0
+        try:
+            for label, worker in (('accept_job', self.accept_worker), ('claim_next_job', self.claim_worker)):
+                self.make_orders(customer, options['orders'])
+                result = self.run(worker, drivers, options['top'])
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(
+                    f"  {result['claims']} claims in {result['seconds']:.2f} s = "
+                    f"{result['claims'] / result['seconds']:.0f} claims/s, "
+                    f"{result['conflicts']} lost races, {result['errors']} worker errors"
+                )
+                for message in result['error_messages']:
+                    self.stdout.write(self.style.ERROR(f'  {message}'))
+                failed += result['errors']
+        finally:
+            Order.objects.filter(user=customer).delete()
+            User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        if failed:
+            raise CommandError(f'{failed} driver thread(s) failed; the claims/s figures are not comparable')
+
+    def make_users(self, count, role):
+        start = User.objects.filter(username__startswith=BENCH_PREFIX).count()
+        users = User.objects.bulk_create([
+            User(username=f'{BENCH_PREFIX}{start + i}', password='!') for i in range(count)
+        ])
+        UserProfile.objects.bulk_create([UserProfile(user=user, role=role) for user in users])
+        return users
+
+    def make_orders(self, customer, count):
+        Order.objects.filter(user=customer).delete()
+        Order.objects.bulk_create([Order(user=customer, total_price=10) for _ in range(count)])
+
+    def accept_worker(self, driver, top, stats):
+        # What the CLI does today: read the job list, pick one, try to accept.
+        while True:
+            jobs = list(order_states.claimable(driver).values_list('id', flat=True)[:top])
+            if not jobs:
+                return
+            if order_states.accept(random.choice(jobs), driver):
+                stats['claims'] += 1
+            else:
+                stats['conflicts'] += 1
+
+    def claim_worker(self, driver, top, stats):
+        while order_states.claim_next(driver) is not None:
+            stats['claims'] += 1
+
+    def run(self, worker, drivers, top):
+        totals = {'claims': 0, 'conflicts': 0, 'errors': 0}
+        messages = set()
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(drivers) + 1)
+
+        def target(driver):
+            stats = {'claims': 0, 'conflicts': 0, 'errors': 0}
+            try:
+                barrier.wait()
+                worker(driver, top, stats)
+            except Exception as exc:
+                # e.g. SQLite "database is locked"; a silently dead thread
+                # would make a partial run look like a valid result.
+                stats['errors'] += 1
+                with lock:
+                    messages.add(f'{type(exc).__name__}: {exc}')
+            finally:
+                connection.close()
+                with lock:
+                    for key, value in stats.items():
+                        totals[key] += value
+
+        threads = [threading.Thread(target=target, args=(driver,)) for driver in drivers]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        totals['seconds'] = time.perf_counter() - start
+        totals['error_messages'] = sorted(messages)
+        return totals
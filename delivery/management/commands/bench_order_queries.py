@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from delivery.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Prints query plans and timings for the order hot paths (seed first, e.g. seed_db --orders 1000000)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--limit', type=int, default=20, help='Rows fetched per query, like one API page')
+        parser.add_argument('--no-explain', action='store_true', help='Skip printing query plans')
+
+    def handle(self, *args, **options):
+        customer = (
+            User.objects.filter(userprofile__role='Customer')
+            .annotate(order_count=Count('order'))
+            .order_by('-order_count')
+            .first()
+        )
+        driver = User.objects.filter(userprofile__role='Driver').first()
+        if customer is None or driver is None:
+            raise CommandError('Need at least one customer and one driver; run seed_db first.')
+
+        total = Order.objects.count()
+        self.stdout.write(f'{total} orders; customer={customer.username} driver={driver.username}\n')
+
+        pending = Order.objects.filter(driver__isnull=True, status='Pending')
+        queries = {
+            'customer history': Order.objects.filter(user=customer),
+            'available jobs': pending,
+            'driver list (OR + DISTINCT)': Order.objects.filter(Q(driver=driver) | Q(driver__isnull=True, status='Pending')).distinct(),
+            'driver list (UNION)': Order.objects.filter(
+                id__in=Order.objects.filter(driver=driver).values('id').union(pending.values('id'))
+            ),
+        }
+
+        for label, queryset in queries.items():
+            queryset = queryset.order_by('-created_at', '-id')[:options['limit']]
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                list(queryset.values_list('id', flat=True))
+                timings.append((time.perf_counter() - start) * 1000)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            if not options['no_explain']:
+                self.stdout.write(queryset.explain())
+            self.stdout.write(
+                f'median {statistics.median(timings):.2f} ms  '
+                f'min {min(timings):.2f} ms  max {max(timings):.2f} ms\n'
+            )
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from delivery import fast_serializers
+from delivery.models import Order, Restaurant
+from delivery.renderers import FastJSONRenderer
+from delivery.serializers import OrderSerializer, RestaurantSerializer
+from delivery.api_views import OrderViewSet
+
+
+class Command(BaseCommand):
+    help = 'Compares list serialization throughput of the DRF serializers and the fast read path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Rows serialized per run')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the best one is reported')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if not Order.objects.exists() or not Restaurant.objects.exists():
+            raise CommandError('Nothing to serialize; run seed_db first.')
+
+        request = Request(APIRequestFactory().get('/api/restaurants/', {'expand': 'menu_items'}))
+        orders = OrderViewSet().get_base_queryset().order_by('-created_at', '-id')[:rows]
+        restaurants = Restaurant.objects.order_by('id')[:rows]
+
+        cases = {
+            'orders': (
+                lambda: JSONRenderer().render(OrderSerializer(orders.all(), many=True).data),
+                lambda: FastJSONRenderer().render(
+                    fast_serializers.serialize_orders(list(fast_serializers.order_rows(orders.all())))
+                ),
+            ),
+            'restaurants (expanded)': (
+                lambda: JSONRenderer().render(RestaurantSerializer(
+                    restaurants.prefetch_related('menu_items'), many=True,
+                    context={'request': request}, expand=['menu_items'],
+                ).data),
+                lambda: FastJSONRenderer().render(fast_serializers.serialize_restaurants(
+                    list(fast_serializers.restaurant_rows(restaurants.all())), request, expand=['menu_items'],
+                )),
+            ),
+        }
+
+        for label, (slow, fast) in cases.items():
+            count = len(orders) if label == 'orders' else len(restaurants)
+            slow_time, slow_bytes = self.best_of(slow, repeat)
+            fast_time, fast_bytes = self.best_of(fast, repeat)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label}: {count} rows'))
+            self.stdout.write(f'  serializer  {slow_time * 1000:8.2f} ms  {count / slow_time:10.0f} rows/s')
+            self.stdout.write(f'  fast path   {fast_time * 1000:8.2f} ms  {count / fast_time:10.0f} rows/s')
+            self.stdout.write(f'  speedup     {slow_time / fast_time:8.1f}x  identical output: {slow_bytes == fast_bytes}')
+
+    def best_of(self, func, repeat):
+        best, output = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
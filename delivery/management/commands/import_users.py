@@ -0,0 +1,172 @@
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connections, transaction
+from rest_framework import serializers
+
+from delivery.models import UserProfile
+from delivery.serializers import UserRegistrationSerializer
+
+PROFILE_FIELDS = ['role', 'phone_number', 'address', 'license_number', 'vehicle_plate', 'vehicle_type', 'bank_account']
+
+
+class ImportRowSerializer(UserRegistrationSerializer):
+    """Registration rules, except a blank password leaves the account without one (set via reset later)
+    and a missing role falls back to the profile default."""
+    password = serializers.CharField(write_only=True, required=False, allow_blank=True)
+    role = serializers.ChoiceField(choices=[('Customer', 'Customer'), ('Driver', 'Driver')], default='Customer')
+
+
+def _init_worker():
+    django.setup()
+
+
+def hash_password(raw):
+    # None produces an unusable password, skipping the expensive hash.
+    return make_password(raw or None)
+
+
+def read_rows(path, fmt):
+    """Yield (line number, row dict) without loading the whole file."""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, '')}
+        else:
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_number, exc
+                    continue
+                yield line_number, row if isinstance(row, dict) else ValueError('Expected a JSON object')
+
+
+class Command(BaseCommand):
+    help = 'Bulk-imports users and their profiles from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV with a header row, or one JSON object per line')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and inserted together')
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (default: one per CPU)')
+        parser.add_argument('--errors', help='Where to write rejected rows as NDJSON (default: <path>.errors.ndjson)')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        fmt = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'ndjson')
+        errors_path = Path(options['errors'] or f'{path}.errors.ndjson')
+        batch_size = max(1, options['batch_size'])
+
+        self.seen = set()
+        self.imported = self.failed = 0
+        start = time.perf_counter()
+
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        pool = ProcessPoolExecutor(options['workers'], initializer=_init_worker) if options['workers'] != 1 else None
+        try:
+            with errors_path.open('w', encoding='utf-8') as errors:
+                self.errors = errors
+                rows = read_rows(path, fmt)
+                while batch := list(islice(rows, batch_size)):
+                    self.import_batch(batch, pool)
+                    self.stdout.write(f'  {self.imported} imported, {self.failed} rejected', ending='\r')
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        self.stdout.write('')
+        if self.failed:
+            self.stdout.write(self.style.WARNING(f'{self.failed} row(s) rejected; see {errors_path}'))
+        else:
+            errors_path.unlink()
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} users in {time.perf_counter() - start:.1f} s'
+        ))
+
+    def reject(self, line_number, row, errors):
+        self.failed += 1
+        username = row.get('username') if isinstance(row, dict) else None
+        self.errors.write(json.dumps({'line': line_number, 'username': username, 'errors': errors}) + '\n')
+
+    def validate(self, batch):
+        valid = []
+        for line_number, row in batch:
+            if isinstance(row, Exception):
+                self.reject(line_number, None, {'row': [str(row)]})
+                continue
+            serializer = ImportRowSerializer(data=row)
+            if not serializer.is_valid():
+                self.reject(line_number, row, serializer.errors)
+                continue
+            data = serializer.validated_data
+            data['username'] = User.normalize_username(data['username'])
+            if data['username'] in self.seen:
+                self.reject(line_number, row, {'username': ['Duplicate username in this file.']})
+                continue
+            self.seen.add(data['username'])
+            valid.append((line_number, row, data))
+
+        # One query per batch instead of one per row.
+        taken = set(User.objects.filter(username__in=[data['username'] for _, _, data in valid]).values_list('username', flat=True))
+        for line_number, row, data in valid:
+            if data['username'] in taken:
+                self.reject(line_number, row, {'username': ['A user with that username already exists.']})
+        return [entry for entry in valid if entry[2]['username'] not in taken]
+
+    def import_batch(self, batch, pool):
+        valid = self.validate(batch)
+        if not valid:
+            return
+
+        passwords = [data.get('password') for _, _, data in valid]
+        if pool is None:
+            hashes = list(map(hash_password, passwords))
+        else:
+            hashes = list(pool.map(hash_password, passwords, chunksize=max(1, len(passwords) // 32)))
+
+        entries = []
+        for (line_number, row, data), password in zip(valid, hashes):
+            user = User(
+                username=data['username'],
+                email=User.objects.normalize_email(data['email']),
+                password=password,
+            )
+            profile = {field: data[field] for field in PROFILE_FIELDS if data.get(field)}
+            entries.append((line_number, row, user, profile))
+
+        try:
+            with transaction.atomic():
+                self.insert(entries)
+            self.imported += len(entries)
+        except IntegrityError:
+            # Someone registered one of these names mid-import; isolate the row.
+            for entry in entries:
+                try:
+                    with transaction.atomic():
+                        entry[2].pk = None
+                        self.insert([entry])
+                    self.imported += 1
+                except IntegrityError as exc:
+                    self.reject(entry[0], entry[1], {'row': [str(exc)]})
+
+    def insert(self, entries):
+        # bulk_create skips post_save, so profiles are written here in one go.
+        users = User.objects.bulk_create([user for _, _, user, _ in entries])
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, **profile) for user, (_, _, _, profile) in zip(users, entries)
+        ])
@@ -0,0 +1,205 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from itertools import islice
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cli.api import BASE_URL, ApiService
+
+LOAD_PREFIX = 'loadtest_'
+LOAD_PASSWORD = 'loadtest-pass-1234'
+# A 400 on these means another request changed the order first (lost race),
+# which is expected under load and reported apart from real errors.
+TRANSITION_ACTIONS = ('accept_job', 'complete_job', 'confirm_receipt', 'claim_next_job')
+ID_SEGMENT = re.compile(r'/\d+/')
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """Thread-safe latency and outcome samples, grouped by endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(list)
+        self._outcomes = defaultdict(lambda: defaultdict(int))
+        self._statuses = defaultdict(lambda: defaultdict(int))
+
+    @staticmethod
+    def endpoint(method, url):
+        path = '/' + urlsplit(url).path.split('/api/', 1)[-1]
+        return f"{method.upper()} {ID_SEGMENT.sub('/{id}/', path)}"
+
+    @staticmethod
+    def outcome(endpoint, status_code):
+        if status_code is None or status_code >= 500:
+            return 'errors'
+        if status_code in (400, 404, 409) and endpoint.rsplit('/', 2)[-2] in TRANSITION_ACTIONS:
+            return 'conflicts'
+        if status_code >= 400:
+            return 'errors'
+        return 'ok'
+
+    def record(self, method, url, status_code, seconds):
+        endpoint = self.endpoint(method, url)
+        with self._lock:
+            self._samples[endpoint].append(seconds)
+            self._outcomes[endpoint][self.outcome(endpoint, status_code)] += 1
+            self._statuses[endpoint][str(status_code or 'connection_error')] += 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        with self._lock:
+            for endpoint in sorted(self._samples):
+                latencies = sorted(self._samples[endpoint])
+                count = len(latencies)
+                outcomes = self._outcomes[endpoint]
+                endpoints[endpoint] = {
+                    'requests': count,
+                    'throughput_rps': round(count / elapsed, 2),
+                    'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+                    'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+                    'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+                    'error_rate': round(outcomes['errors'] / count, 4),
+                    'conflict_rate': round(outcomes['conflicts'] / count, 4),
+                    'statuses': dict(self._statuses[endpoint]),
+                }
+        total = sum(stats['requests'] for stats in endpoints.values())
+        return {
+            'elapsed_seconds': round(elapsed, 2),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else 0,
+            'endpoints': endpoints,
+        }
+
+
+class LoadApiService(ApiService):
+    """ApiService that keeps its token in memory and times every request once `recorder` is set."""
+
+    def __init__(self, base_url):
+        super().__init__(base_url=base_url, token_file=None, http_cache_file=None)
+        self.recorder = None
+
+    def _request(self, method, endpoint, **kwargs):
+        start = time.perf_counter()
+        response, error = super()._request(method, endpoint, **kwargs)
+        if self.recorder is not None:
+            self.recorder.record(
+                method, self._url(endpoint), response.status_code if response is not None else None,
+                time.perf_counter() - start,
+            )
+        return response, error
+
+
+class Command(BaseCommand):
+    help = 'Drives a running server with simulated customers and drivers and reports latency as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default=BASE_URL, help='API root of the server under test')
+        parser.add_argument('--customers', type=int, default=20, help='Concurrent simulated customers')
+        parser.add_argument('--drivers', type=int, default=5, help='Concurrent simulated drivers')
+        parser.add_argument('--duration', type=float, default=60.0, help='Seconds to generate load for')
+        parser.add_argument('--think-time', type=float, default=0.0, help='Max random pause between user steps, in seconds')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for the simulated users\' choices')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url']
+        self.think_time = options['think_time']
+        self.stop = threading.Event()
+        recorder = Recorder()
+        seeds = random.Random(options['seed'])
+
+        # Sign-in traffic is setup, so it happens before the recorder is attached.
+        self.stderr.write('Signing in simulated users...')
+        workers = []
+        for role, count, loop in (('Customer', options['customers'], self.customer_loop),
+                                  ('Driver', options['drivers'], self.driver_loop)):
+            for index in range(count):
+                api = self.sign_in(role, index)
+                api.recorder = recorder
+                workers.append(threading.Thread(target=loop, args=(api, random.Random(seeds.random())), daemon=True))
+
+        self.stderr.write(f"Running {len(workers)} users for {options['duration']:.0f} s against {self.base_url}...")
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        self.stop.wait(options['duration'])
+        self.stop.set()
+        for thread in workers:
+            thread.join()
+
+        report = recorder.report(time.perf_counter() - start)
+        report['config'] = {key: options[key] for key in ('base_url', 'customers', 'drivers', 'duration', 'think_time', 'seed')}
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(payload + '\n')
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(payload)
+
+    def sign_in(self, role, index):
+        api = LoadApiService(self.base_url)
+        username = f'{LOAD_PREFIX}{role.lower()}_{index}'
+        ok, message = api.login(username, LOAD_PASSWORD)
+        if not ok:
+            ok, message = api.register({
+                'username': username,
+                'email': f'{username}@example.com',
+                'password': LOAD_PASSWORD,
+                'role': role,
+            })
+        if not ok:
+            raise CommandError(f'Could not sign in {username}: {message}')
+        return api
+
+    def pause(self, rng):
+        if self.think_time:
+            self.stop.wait(rng.uniform(0, self.think_time))
+
+    def customer_loop(self, api, rng):
+        confirmed = set()
+        while not self.stop.is_set():
+            restaurants = api.get_restaurants()
+            self.pause(rng)
+            if not restaurants:
+                continue
+            menu = api.get_menu(rng.choice(restaurants)['id']) or {}
+            items = menu.get('menu_items') or []
+            self.pause(rng)
+            if items:
+                picked = rng.sample(items, k=min(len(items), rng.randint(1, 3)))
+                api.create_order({item['id']: rng.randint(1, 2) for item in picked})
+            self.pause(rng)
+
+            # Only the newest page; older orders are settled or someone else's problem.
+            for order in islice(api.iter_orders(), 20):
+                if order['status'] == 'Delivering' and order['id'] not in confirmed:
+                    api.confirm_receipt(order['id'])
+                    confirmed.add(order['id'])
+
+    def driver_loop(self, api, rng):
+        api.set_availability(True)
+        while not self.stop.is_set():
+            # Drivers look at the top of the board, like the CLI shows it.
+            jobs = list(islice(api.iter_available_jobs(), 5))
+            if not jobs:
+                self.stop.wait(0.5)
+                continue
+            self.pause(rng)
+            job = rng.choice(jobs)
+            if api.accept_job(job['id']):
+                self.pause(rng)
+                api.complete_job(job['id'])
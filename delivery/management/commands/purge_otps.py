@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from delivery.models import EmailOTP
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired and verified email OTP codes in bounded batches (safe to run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # Expired rows go first through the expires_at index; whatever
+        # verified rows remain are from the last few minutes, so the second
+        # pass only scans a small tail of the table.
+        expired = self.purge(EmailOTP.objects.filter(expires_at__lte=now), options['batch_size'])
+        verified = self.purge(EmailOTP.objects.filter(is_verified=True), options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {expired} expired and {verified} verified OTP codes'))
+
+    def purge(self, queryset, batch_size):
+        deleted = 0
+        while True:
+            ids = list(queryset.order_by().values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += EmailOTP.objects.filter(id__in=ids).delete()[0]
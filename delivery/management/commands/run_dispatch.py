@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from delivery.dispatch import DispatchEngine
+
+
+class Command(BaseCommand):
+    help = 'Runs the driver dispatch loop, offering pending orders to available drivers one at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between matching rounds')
+        parser.add_argument('--offer-timeout', type=int, default=30, help='Seconds a driver has to accept an offer')
+        parser.add_argument('--value-weight', type=float, default=1.0, help='Seconds of queue seniority per unit of order value')
+        parser.add_argument('--once', action='store_true', help='Run a single round and exit')
+
+    def handle(self, *args, **options):
+        engine = DispatchEngine(
+            offer_timeout=timedelta(seconds=options['offer_timeout']),
+            value_weight=options['value_weight'],
+        )
+        rounds = engine.run(interval=options['interval'], max_rounds=1 if options['once'] else None)
+        try:
+            for offers in rounds:
+                if offers:
+                    self.stdout.write(f'Offered {offers} job(s)')
+        except KeyboardInterrupt:
+            self.stdout.write('Dispatcher stopped')
@@ -1,6 +1,9 @@
 from django.core.management.base import BaseCommand
 import typer
 from typing import Optional, Dict
+from itertools import islice
+import time
+from rich.live import Live
 import questionary
 from questionary import Style
 from cli.api import ApiService
@@ -11,6 +14,9 @@ api = ApiService()
 
 # In-memory shopping cart
 cart: Dict[int, int] = {}
+# Restaurant each cart item came from, when known, so the cart view can fetch
+# just those menus instead of the whole catalog.
+cart_restaurants: Dict[int, int] = {}
 
 # Custom style for questionary prompts
 custom_style = Style([
@@ -52,6 +58,7 @@ def main():
             choices.extend([
                 "Browse Restaurants",
                 "View My Orders",
+                "Watch Orders Live",
                 "View Cart",
                 "My Profile",
             ])
@@ -60,6 +67,8 @@ def main():
             if profile.get('role') == 'Driver':
                 choices.extend([
                     "Driver: View Jobs",
+                    "Driver: Job Offers",
+                    "Driver: Claim Next Job",
                     "Driver: Accept Job",
                     "Driver: Complete Job",
                 ])
@@ -92,6 +101,9 @@ def main():
             ui.clear_screen()
             list_orders()
             input("\nPress Enter to continue...")
+        elif action == "Watch Orders Live":
+            ui.clear_screen()
+            watch(limit=20)
         elif action == "View Cart":
             ui.clear_screen()
             view_cart_internal()
@@ -104,6 +116,14 @@ def main():
             ui.clear_screen()
             available_jobs()
             input("\nPress Enter to continue...")
+        elif action == "Driver: Job Offers":
+            ui.clear_screen()
+            job_offers()
+            input("\nPress Enter to continue...")
+        elif action == "Driver: Claim Next Job":
+            ui.clear_screen()
+            claim_job()
+            input("\nPress Enter to continue...")
         elif action == "Driver: Accept Job":
             ui.clear_screen()
             accept_job()
@@ -199,8 +219,7 @@ def list_restaurants():
 @app.command(name="menu")
 def view_menu(restaurant_id: int):
     """View menu for a specific restaurant."""
-    restaurants = api.get_restaurants()
-    target_r = next((r for r in restaurants if r['id'] == restaurant_id), None)
+    target_r = api.get_menu(restaurant_id)
     if target_r:
         ui.display_menu(target_r['name'], target_r['menu_items'])
     else:
@@ -241,7 +260,7 @@ def browse(return_to_menu: bool = False):
         
         # Extract restaurant ID
         restaurant_id = int(selected.split(":")[0])
-        restaurant = next((r for r in restaurants if r['id'] == restaurant_id), None)
+        restaurant = api.get_menu(restaurant_id)
         
         if not restaurant:
             continue
@@ -291,6 +310,7 @@ def browse(return_to_menu: bool = False):
                         qty = int(qty)
                         if qty > 0:
                             cart[item_id] = cart.get(item_id, 0) + qty
+                            cart_restaurants[item_id] = restaurant_id
                             ui.print_success(f"Added {qty}x {item['name']} to cart!")
                         else:
                             ui.print_error("Quantity must be positive")
@@ -317,6 +337,7 @@ def remove_from_cart(item_id: int):
     """Remove an item from the shopping cart."""
     if item_id in cart:
         del cart[item_id]
+        cart_restaurants.pop(item_id, None)
         ui.print_success(f"Removed item #{item_id} from cart")
     else:
         ui.print_error("Item not in cart")
@@ -332,10 +353,13 @@ def view_cart_internal():
         ui.console.print("[yellow]Your cart is empty[/yellow]")
         return
     
-    # Fetch all restaurants to get item details
-    restaurants = api.get_restaurants()
+    if all(item_id in cart_restaurants for item_id in cart):
+        restaurants = [api.get_menu(restaurant_id) for restaurant_id in sorted(set(cart_restaurants.values()))]
+    else:
+        # Items added by id alone; only the full catalog says where they are from.
+        restaurants = api.get_restaurants(with_menus=True)
     all_items = {}
-    for r in restaurants:
+    for r in filter(None, restaurants):
         for item in r['menu_items']:
             all_items[item['id']] = {
                 'name': item['name'],
@@ -360,6 +384,7 @@ def clear_cart():
     
     if confirm:
         cart.clear()
+        cart_restaurants.clear()
         ui.print_success("Cart cleared!")
     else:
         ui.console.print("[yellow]Cancelled[/yellow]")
@@ -395,6 +420,7 @@ def checkout_cart():
         ui.print_success(f"Order #{resp['id']} placed successfully!")
         ui.console.print(f"[green]Total: ${resp['total_price']}[/green]")
         cart.clear()
+        cart_restaurants.clear()
     else:
         ui.print_error(f"Failed to place order: {resp}")
 
@@ -462,6 +488,30 @@ def cancel(order_id: Optional[int] = None):
     else:
         ui.console.print("[yellow]Cancellation aborted[/yellow]")
 
+@app.command()
+def watch(limit: int = typer.Option(20, help="Number of orders to show")):
+    """Watch your orders update live over one streaming connection (Ctrl+C to stop)."""
+    if not api.get_my_profile():
+        ui.print_error("Could not fetch profile. Are you logged in?")
+        return
+
+    orders = {o['id']: o for o in islice(api.iter_orders(), limit)}
+
+    def render():
+        newest = sorted(orders.values(), key=lambda o: o['id'], reverse=True)[:limit]
+        return ui.orders_table(newest, title="Live Orders (Ctrl+C to stop)")
+
+    with Live(render(), console=ui.console, refresh_per_second=4) as live:
+        try:
+            while True:
+                for event in api.stream_order_events():
+                    orders[event['id']] = {**orders.get(event['id'], {}), **event}
+                    live.update(render())
+                # The stream ended (server restart, network blip): reconnect.
+                time.sleep(3)
+        except KeyboardInterrupt:
+            pass
+
 # ==================== DRIVER COMMANDS ====================
 
 driver_app = typer.Typer(help="Driver-specific commands")
@@ -476,6 +526,55 @@ def available_jobs():
     else:
         ui.console.print("[yellow]No available jobs at the moment[/yellow]")
 
+@driver_app.command("claim")
+def claim_job():
+    """(Driver) Take the oldest open job without picking from the list."""
+    job = api.claim_next_job()
+    if job:
+        ui.print_success(f"Job #{job['id']} from {job['restaurant_name']} is yours (${job['total_price']})")
+    else:
+        ui.console.print("[yellow]No available jobs at the moment[/yellow]")
+
+@driver_app.command("offers")
+def job_offers():
+    """(Driver) Review jobs the dispatcher has offered to you."""
+    offers = api.get_job_offers()
+    if not offers:
+        ui.console.print("[yellow]No open offers. Go online with 'driver online' to receive some.[/yellow]")
+        return
+
+    ui.display_available_jobs(offers)
+    for offer in offers:
+        answer = questionary.select(
+            f"Order #{offer['id']} - {offer['restaurant_name']} (${offer['total_price']})",
+            choices=["Accept", "Decline", "Skip"],
+            style=custom_style
+        ).ask()
+        if answer == "Accept":
+            if api.accept_job(offer['id']):
+                ui.print_success(f"Job #{offer['id']} accepted!")
+            else:
+                ui.print_error("Offer is no longer available.")
+        elif answer == "Decline":
+            api.decline_offer(offer['id'])
+            ui.console.print(f"[yellow]Declined order #{offer['id']}[/yellow]")
+
+@driver_app.command("online")
+def go_online():
+    """(Driver) Start receiving job offers from the dispatcher."""
+    if api.set_availability(True):
+        ui.print_success("You are online.")
+    else:
+        ui.print_error("Could not update availability.")
+
+@driver_app.command("offline")
+def go_offline():
+    """(Driver) Stop receiving job offers."""
+    if api.set_availability(False):
+        ui.print_success("You are offline.")
+    else:
+        ui.print_error("Could not update availability.")
+
 @driver_app.command("accept")
 def accept_job(order_id: Optional[int] = None):
     """(Driver) Accept a delivery job."""
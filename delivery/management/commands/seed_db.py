@@ -1,122 +1,244 @@
 import random
-from django.core.management.base import BaseCommand
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from multiprocessing import get_context
+
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from delivery.models import UserProfile, Restaurant, MenuItem, Order, OrderItem
-from faker import Faker
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connections, transaction
 from django.utils import timezone
+from faker import Faker
+
+from delivery.catalog import invalidate_catalog
+from delivery.models import UserProfile, Restaurant, MenuItem, Order, OrderItem
+
+ORDER_STATUSES = ['Pending', 'Delivering', 'Delivered', 'Cancelled']
+DISHES = ['Burger', 'Pizza', 'Salad', 'Soup', 'Pasta']
+# Order history ends here when --seed is given without --anchor-date, so the
+# same seed produces the same timestamps on any day.
+SEEDED_ANCHOR_DATE = date(2025, 1, 1)
+
+# Set once per worker process by _init_worker so chunks don't re-pickle them.
+_order_context = {}
+
+
+def _chunk_rng(seed, kind, chunk):
+    # Each chunk owns its own stream, so output is identical no matter how
+    # many workers split the work or in what order chunks finish.
+    return random.Random(f'{seed}:{kind}:{chunk}')
+
+
+def _chunk_faker(seed, kind, chunk):
+    fake = Faker()
+    fake.seed_instance(f'{seed}:{kind}:{chunk}')
+    return fake
+
+
+def generate_users(args):
+    seed, chunk, start, count = args
+    rng, fake = _chunk_rng(seed, 'users', chunk), _chunk_faker(seed, 'users', chunk)
+    rows = []
+    for index in range(start, start + count):
+        role = rng.choice(['Customer', 'Driver'])
+        row = {
+            # Seed and running index keep names unique without a query per
+            # user, and depend on nothing but the arguments.
+            'username': f'{fake.user_name()}.{seed}.{index}',
+            'email': fake.email(),
+            'role': role,
+            'phone_number': fake.phone_number()[:15],
+        }
+        if role == 'Customer':
+            row['address'] = fake.address()
+        else:
+            row['vehicle_type'] = rng.choice(['Bike', 'Car', 'Scooter'])
+            row['vehicle_plate'] = fake.license_plate()
+            row['license_number'] = fake.bothify(text='??-#####')
+            row['is_available'] = rng.choice([True, False])
+        rows.append(row)
+    return rows
+
+
+def _init_worker(customer_ids, driver_ids, menus, anchor):
+    _order_context.update(customer_ids=customer_ids, driver_ids=driver_ids, menus=menus, anchor=anchor)
+
+
+def generate_orders(args):
+    seed, chunk, count = args
+    rng = _chunk_rng(seed, 'orders', chunk)
+    customer_ids = _order_context['customer_ids']
+    driver_ids = _order_context['driver_ids']
+    menus = _order_context['menus']
+    restaurant_ids = sorted(menus)
+    anchor = _order_context['anchor']
+
+    orders = []
+    for _ in range(count):
+        restaurant_id = rng.choice(restaurant_ids)
+        menu = menus[restaurant_id]
+        status = rng.choice(ORDER_STATUSES)
+        driver_id = rng.choice(driver_ids) if status in ('Delivering', 'Delivered') and driver_ids else None
+
+        items = []
+        total = Decimal('0.00')
+        for _ in range(rng.randint(1, 4)):
+            menu_item_id, price = rng.choice(menu)
+            quantity = rng.randint(1, 2)
+            items.append((menu_item_id, quantity, price))
+            total += price * quantity
+
+        orders.append({
+            'user_id': rng.choice(customer_ids),
+            'driver_id': driver_id,
+            'restaurant_id': restaurant_id,
+            'status': status,
+            'total_price': total,
+            'created_at': anchor - timedelta(seconds=rng.randint(0, 30 * 24 * 3600), microseconds=rng.randint(0, 999999)),
+            'driver_confirmed': status == 'Delivered',
+            'customer_confirmed': status == 'Delivered',
+            'items': items,
+        })
+    return orders
 
-fake = Faker()
 
 class Command(BaseCommand):
-    help = 'Seeds the database with mock data'
+    help = 'Seeds the database with mock data using batched bulk inserts'
 
     def add_arguments(self, parser):
         parser.add_argument('--users', type=int, default=10, help='Number of users to create')
         parser.add_argument('--restaurants', type=int, default=5, help='Number of restaurants to create')
         parser.add_argument('--orders', type=int, default=20, help='Number of orders to create')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows generated and inserted per batch')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible data')
+        parser.add_argument('--workers', type=int, default=1, help='Processes used to generate rows')
+        parser.add_argument(
+            '--anchor-date', type=date.fromisoformat, default=None,
+            help=f'Day (YYYY-MM-DD) the order history ends on (default: today, or {SEEDED_ANCHOR_DATE} with --seed)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write('Seeding database...')
-        
-        users_count = options['users']
-        restaurants_count = options['restaurants']
-        orders_count = options['orders']
-
-        # Create Users
-        customers = []
-        drivers = []
-        
-        for _ in range(users_count):
-            username = fake.user_name()
-            # Ensure unique username
-            while User.objects.filter(username=username).exists():
-                username = fake.user_name() + str(random.randint(1, 1000))
-                
-            user = User.objects.create_user(
-                username=username,
-                email=fake.email(),
-                password='pass1234'
-            )
-            
-            role = random.choice(['Customer', 'Driver'])
-            profile, _ = UserProfile.objects.get_or_create(user=user)
-            profile.role = role
-            profile.phone_number = fake.phone_number()[:15] # Limit length
-            
-            if role == 'Customer':
-                profile.address = fake.address()
-                customers.append(user)
-            else:
-                profile.vehicle_type = random.choice(['Bike', 'Car', 'Scooter'])
-                profile.vehicle_plate = fake.license_plate()
-                profile.license_number = fake.bothify(text='??-#####')
-                profile.is_available = random.choice([True, False])
-                drivers.append(user)
-            
-            profile.save()
-            
-        self.stdout.write(self.style.SUCCESS(f'Created {users_count} users'))
-
-        # Create Restaurants
-        restaurants = []
-        for _ in range(restaurants_count):
-            restaurant = Restaurant.objects.create(
-                name=fake.company() + " Food",
-                address=fake.address(),
-                description=fake.catch_phrase()
-            )
-            restaurants.append(restaurant)
-            
-            # Create Menu Items
-            for _ in range(random.randint(5, 10)):
-                MenuItem.objects.create(
-                    restaurant=restaurant,
-                    name=fake.word().title() + " " + random.choice(['Burger', 'Pizza', 'Salad', 'Soup', 'Pasta']),
-                    description=fake.sentence(),
-                    price=round(random.uniform(5.0, 30.0), 2)
-                )
-        
-        self.stdout.write(self.style.SUCCESS(f'Created {restaurants_count} restaurants'))
 
-        # Create Orders
-        if not customers or not restaurants:
+        self.seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        self.batch_size = max(1, options['batch_size'])
+        self.workers = max(1, options['workers'])
+        if options['anchor_date'] is not None:
+            anchor_date = options['anchor_date']
+        else:
+            anchor_date = SEEDED_ANCHOR_DATE if options['seed'] is not None else timezone.now().date()
+        self.anchor = datetime.combine(anchor_date, time.min, tzinfo=dt_timezone.utc)
+        self.stdout.write(f'Using seed {self.seed}, orders up to {anchor_date}')
+
+        # Inherited connections must not be shared with forked workers.
+        connections.close_all()
+
+        try:
+            customer_ids, driver_ids = self.create_users(options['users'])
+        except IntegrityError:
+            raise CommandError(f'Users for seed {self.seed} already exist; use another --seed or an empty database')
+        self.stdout.write(self.style.SUCCESS(f"Created {options['users']} users"))
+
+        menus = self.create_restaurants(options['restaurants'])
+        invalidate_catalog()
+        self.stdout.write(self.style.SUCCESS(f"Created {options['restaurants']} restaurants"))
+
+        if not customer_ids or not menus:
             self.stdout.write(self.style.WARNING('Not enough customers or restaurants to create orders'))
             return
 
-        for _ in range(orders_count):
-            customer = random.choice(customers)
-            restaurant = random.choice(restaurants)
-            menu_items = list(restaurant.menu_items.all())
-            
-            if not menu_items:
-                continue
-                
-            status = random.choice(['Pending', 'In Progress', 'Delivering', 'Delivered'])
-            driver = None
-            if status in ['Delivering', 'Delivered'] and drivers:
-                driver = random.choice(drivers)
-            
-            order = Order.objects.create(
-                user=customer,
-                status=status,
-                total_price=0, # Will update
-                driver=driver,
-                created_at=fake.date_time_between(start_date='-30d', end_date='now', tzinfo=timezone.get_current_timezone())
-            )
-            
-            # Add items
-            total = 0
-            for _ in range(random.randint(1, 4)):
-                item = random.choice(menu_items)
-                OrderItem.objects.create(
-                    order=order,
-                    menu_item=item,
-                    quantity=random.randint(1, 2),
-                    price_at_time=item.price
+        created = self.create_orders(options['orders'], customer_ids, driver_ids, menus)
+        self.stdout.write(self.style.SUCCESS(f'Created {created} orders'))
+
+    def chunks(self, total):
+        for chunk, start in enumerate(range(0, total, self.batch_size)):
+            yield chunk, start, min(self.batch_size, total - start)
+
+    def map(self, func, tasks, initializer=None, initargs=()):
+        """Run `func` over `tasks` in order, in worker processes when asked to."""
+        if self.workers == 1:
+            if initializer:
+                initializer(*initargs)
+            yield from map(func, tasks)
+            return
+        with get_context().Pool(self.workers, initializer=initializer, initargs=initargs) as pool:
+            yield from pool.imap(func, tasks)
+        connections.close_all()
+
+    def create_users(self, count):
+        password = make_password('pass1234')
+        customer_ids, driver_ids = [], []
+
+        tasks = [(self.seed, chunk, start, size) for chunk, start, size in self.chunks(count)]
+        for rows in self.map(generate_users, tasks):
+            with transaction.atomic():
+                # bulk_create skips the post_save profile signals, so profiles
+                # are written here once, fully populated.
+                users = User.objects.bulk_create([
+                    User(username=row['username'], email=row['email'], password=password) for row in rows
+                ])
+                UserProfile.objects.bulk_create([
+                    UserProfile(
+                        user=user,
+                        **{key: value for key, value in row.items() if key not in ('username', 'email')},
+                    )
+                    for user, row in zip(users, rows)
+                ])
+            for user, row in zip(users, rows):
+                (customer_ids if row['role'] == 'Customer' else driver_ids).append(user.id)
+        return customer_ids, driver_ids
+
+    def create_restaurants(self, count):
+        rng, fake = _chunk_rng(self.seed, 'restaurants', 0), _chunk_faker(self.seed, 'restaurants', 0)
+        cuisines = [choice for choice, _ in Restaurant.CUISINE_CHOICES]
+
+        with transaction.atomic():
+            restaurants = Restaurant.objects.bulk_create([
+                Restaurant(
+                    name=fake.company() + " Food",
+                    address=fake.address(),
+                    description=fake.catch_phrase(),
+                    cuisine=rng.choice(cuisines),
+                )
+                for _ in range(count)
+            ], batch_size=self.batch_size)
+
+            menu_items = MenuItem.objects.bulk_create([
+                MenuItem(
+                    restaurant=restaurant,
+                    name=fake.word().title() + " " + rng.choice(DISHES),
+                    description=fake.sentence(),
+                    price=Decimal(str(round(rng.uniform(5.0, 30.0), 2))),
                 )
-                total += item.price
-            
-            order.total_price = total
-            order.save()
+                for restaurant in restaurants
+                for _ in range(rng.randint(5, 10))
+            ], batch_size=self.batch_size)
+
+        menus = {}
+        for item in menu_items:
+            menus.setdefault(item.restaurant_id, []).append((item.id, item.price))
+        return menus
+
+    def create_orders(self, count, customer_ids, driver_ids, menus):
+        tasks = [(self.seed, chunk, size) for chunk, _, size in self.chunks(count)]
 
-        self.stdout.write(self.style.SUCCESS(f'Created {orders_count} orders'))
+        created = 0
+        for rows in self.map(generate_orders, tasks, _init_worker, (customer_ids, driver_ids, menus, self.anchor)):
+            with transaction.atomic():
+                orders = Order.objects.bulk_create([
+                    Order(**{key: value for key, value in row.items() if key != 'items'}) for row in rows
+                ])
+                # auto_now_add stamps every row with the insert time; put the
+                # generated history back in one statement per batch.
+                for order, row in zip(orders, rows):
+                    order.created_at = row['created_at']
+                Order.objects.bulk_update(orders, ['created_at'], batch_size=self.batch_size)
+                OrderItem.objects.bulk_create([
+                    OrderItem(order=order, menu_item_id=menu_item_id, quantity=quantity, price_at_time=price)
+                    for order, row in zip(orders, rows)
+                    for menu_item_id, quantity, price in row['items']
+                ])
+            created += len(orders)
+            self.stdout.write(f'  {created}/{count} orders', ending='\r')
+        self.stdout.write('')
+        return created
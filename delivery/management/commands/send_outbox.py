@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from delivery.outbox import MAX_ATTEMPTS, send_pending
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails from the outbox over one SMTP connection per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Emails sent per connection')
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS, help='Attempts before an email is marked failed')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to wait when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the outbox and exit')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                sent, failed = send_pending(options['batch_size'], options['max_attempts'])
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent} email(s), {failed} failed')
+                # A batch with no successes usually means the server is down;
+                # wait before trying again rather than spinning on it.
+                if sent:
+                    continue
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Outbox sender stopped')
@@ -0,0 +1,155 @@
+"""Per-request timings: a Server-Timing header and per-route Prometheus histograms.
+
+`RequestMetricsMiddleware` times every request and its database work;
+renderers report serialization time through `measure_render`. Histograms
+live in process memory, so with several workers each one exposes its own
+series on `metrics/` and Prometheus should scrape every worker.
+"""
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = '<unmatched>'
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Accumulates database and render time for one request.
+
+    Also the `connection.execute_wrapper` that counts its queries.
+    """
+
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.render = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+
+@contextmanager
+def measure_render():
+    """Add the time spent inside the block to the current request's render time."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.render += time.perf_counter() - start
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, labels, value):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = ','.join(f'{name}="{_escape(value)}"' for name, value in key)
+                for bound, count in zip(self.buckets, series['buckets']):
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series["count"]}')
+                lines.append(f'{self.name}_sum{{{labels}}} {series["sum"]}')
+                lines.append(f'{self.name}_count{{{labels}}} {series["count"]}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Total time spent handling the request.', DURATION_BUCKETS)
+DB_SECONDS = Histogram('http_request_db_seconds', 'Time spent in database queries per request.', DURATION_BUCKETS)
+DB_QUERIES = Histogram('http_request_db_queries', 'Database queries issued per request.', QUERY_BUCKETS)
+RENDER_SECONDS = Histogram('http_request_render_seconds', 'Time spent serializing the response body.', DURATION_BUCKETS)
+HISTOGRAMS = (REQUEST_SECONDS, DB_SECONDS, DB_QUERIES, RENDER_SECONDS)
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+def route_label(request):
+    # The URL name, not the path, so ids don't create a series per order.
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return match.view_name or match.route or UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={total * 1000:.2f}',
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"',
+            f'render;dur={timings.render * 1000:.2f}',
+        ])
+
+        labels = {'route': route_label(request), 'method': request.method}
+        REQUEST_SECONDS.observe(labels, total)
+        DB_SECONDS.observe(labels, timings.db)
+        DB_QUERIES.observe(labels, timings.queries)
+        RENDER_SECONDS.observe(labels, timings.render)
+        return response
+
+
+def metrics_view(request):
+    """Prometheus text exposition of the request histograms."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.expose())
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
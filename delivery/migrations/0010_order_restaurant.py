@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0009_emailotp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='restaurant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='delivery.restaurant'),
+        ),
+    ]
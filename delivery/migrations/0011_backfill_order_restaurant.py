@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:10
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_order_restaurant(apps, schema_editor):
+    Order = apps.get_model('delivery', 'Order')
+    OrderItem = apps.get_model('delivery', 'OrderItem')
+
+    # Same rule the serializer used to apply at read time: an order belongs
+    # to the restaurant of its first item.
+    first_item_restaurant = OrderItem.objects.filter(order=OuterRef('pk')).order_by('id').values('menu_item__restaurant')[:1]
+    Order.objects.filter(restaurant__isnull=True).update(restaurant=Subquery(first_item_restaurant))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0010_order_restaurant'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_restaurant, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0011_backfill_order_restaurant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['driver', '-created_at', '-id'], name='order_driver_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('driver__isnull', True), ('status', 'Pending')), fields=['-created_at', '-id'], name='order_pending_unassigned_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0013_idempotencykey'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Offered', 'Offered'), ('Accepted', 'Accepted'), ('Declined', 'Declined'), ('Expired', 'Expired')], default='Offered', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_offers', to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='delivery.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['driver', 'status'], name='joboffer_driver_status_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'Offered')), fields=('order',), name='one_open_offer_per_order')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('delivery', '0015_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailotp',
+            index=models.Index(fields=['email', 'otp_code', 'is_verified'], name='emailotp_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailotp',
+            index=models.Index(fields=['expires_at'], name='emailotp_expires_idx'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
+from .caching import invalidate_tags
+from .catalog import invalidate_catalog
 
 class UserProfile(models.Model):
     ROLE_CHOICES = [
@@ -31,15 +34,24 @@ class UserProfile(models.Model):
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
+    # Only new users get a profile, populated from `_profile_defaults` when the
+    # creator set it, so registration writes the profile once. Later saves
+    # (last_login, admin edits) leave the profile alone.
     if created:
-        UserProfile.objects.create(user=instance)
+        UserProfile.objects.create(user=instance, **getattr(instance, '_profile_defaults', {}))
+
+def profile_tag(user_id):
+    return f'profile:{user_id}'
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_tags(profile_tag(instance.user_id))
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    try:
-        instance.userprofile.save()
-    except UserProfile.DoesNotExist:
-        UserProfile.objects.create(user=instance)
+def invalidate_cached_user(sender, instance, created, **kwargs):
+    # The cached profile embeds username and email.
+    if not created:
+        invalidate_tags(profile_tag(instance.id))
 
 class Restaurant(models.Model):
     CUISINE_CHOICES = [
@@ -73,6 +85,11 @@ class MenuItem(models.Model):
     def __str__(self):
         return self.name
 
+@receiver([post_save, post_delete], sender=Restaurant)
+@receiver([post_save, post_delete], sender=MenuItem)
+def bump_catalog_on_change(sender, **kwargs):
+    invalidate_catalog()
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('Pending', 'Pending'),
@@ -83,6 +100,7 @@ class Order(models.Model):
 
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     driver = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='deliveries')
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.SET_NULL, null=True, blank=True, related_name='orders')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
     total_price = models.DecimalField(max_digits=8, decimal_places=2, default=0.00)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -90,9 +108,40 @@ class Order(models.Model):
     driver_confirmed = models.BooleanField(default=False)
     customer_confirmed = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_idx'),
+            models.Index(fields=['driver', '-created_at', '-id'], name='order_driver_created_idx'),
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(status='Pending', driver__isnull=True),
+                name='order_pending_unassigned_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.status}"
 
+class IdempotencyKey(models.Model):
+    """Response of an order creation, replayed for retries carrying the same key"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    key = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_key_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} for {self.user_id}"
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE)
@@ -102,6 +151,35 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.quantity} x {self.menu_item.name}"
 
+class JobOffer(models.Model):
+    """A pending order offered exclusively to one driver until it expires"""
+    STATUS_CHOICES = [
+        ('Offered', 'Offered'),
+        ('Accepted', 'Accepted'),
+        ('Declined', 'Declined'),
+        ('Expired', 'Expired'),
+    ]
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='offers')
+    driver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_offers')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Offered')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order'],
+                condition=models.Q(status='Offered'),
+                name='one_open_offer_per_order',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['driver', 'status'], name='joboffer_driver_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Offer of order {self.order_id} to {self.driver_id} - {self.status}"
+
 class Review(models.Model):
     order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='review')
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='reviews')
@@ -123,6 +201,12 @@ class EmailOTP(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # VerifyOTPView looks up (email, otp_code, is_verified); SendOTPView
+            # deletes by (email, is_verified) using the same leading column.
+            models.Index(fields=['email', 'otp_code', 'is_verified'], name='emailotp_lookup_idx'),
+            models.Index(fields=['expires_at'], name='emailotp_expires_idx'),
+        ]
     
     def __str__(self):
         return f"OTP for {self.email} - {'Verified' if self.is_verified else 'Pending'}"
@@ -131,3 +215,30 @@ class EmailOTP(models.Model):
         from django.utils import timezone
         return timezone.now() > self.expires_at
 
+
+class EmailOutbox(models.Model):
+    """Outgoing email, committed with the change that caused it and sent by `send_outbox`"""
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Sent', 'Sent'),
+        ('Failed', 'Failed'),
+    ]
+    to_email = models.EmailField()
+    from_email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"Email to {self.to_email} - {self.status}"
+
@@ -0,0 +1,105 @@
+"""Order status transitions as single compare-and-swap UPDATEs.
+
+Every transition is one ``UPDATE ... WHERE id = ... AND status = ...`` and
+returns True only when this caller's statement changed the row, so two
+requests racing on the same order can never both win or lose an update.
+"""
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+
+from .dispatch import offered_to_someone_else
+from .events import order_changed
+from .models import JobOffer, Order
+
+PENDING = 'Pending'
+DELIVERING = 'Delivering'
+DELIVERED = 'Delivered'
+CANCELLED = 'Cancelled'
+
+
+def _won(order_id, updated, open_jobs=False):
+    if updated:
+        order_changed(order_id, open_jobs)
+    return updated == 1
+
+
+def cancel(order_id, user):
+    """Customer cancels their own order while it is still pending."""
+    updated = Order.objects.filter(id=order_id, user=user, status=PENDING).update(status=CANCELLED)
+    if updated:
+        # Withdraw any open offer so the driver stops seeing it as live.
+        JobOffer.objects.filter(order_id=order_id, status='Offered').update(status='Expired')
+    return _won(order_id, updated, open_jobs=True)
+
+
+def claimable(driver):
+    """Pending, unassigned orders this driver may take, oldest first."""
+    return Order.objects.filter(
+        ~offered_to_someone_else(driver), status=PENDING, driver__isnull=True,
+    ).order_by('created_at', 'id')
+
+
+def _assign(order_id, driver):
+    updated = claimable(driver).filter(id=order_id).update(driver=driver, status=DELIVERING)
+    if updated:
+        JobOffer.objects.filter(order_id=order_id, status='Offered').update(
+            status=Case(When(driver=driver, then=Value('Accepted')), default=Value('Expired')),
+        )
+    return updated
+
+
+def accept(order_id, driver):
+    """Driver takes a pending, unassigned order not reserved for another driver."""
+    return _won(order_id, _assign(order_id, driver), open_jobs=True)
+
+
+_claim_lock = threading.Lock()
+
+
+def claim_next(driver, candidates=5):
+    """Assign the oldest claimable order to `driver` and return its id, or None.
+
+    On databases with SKIP LOCKED, concurrent claimers lock different rows
+    and never contend for the same order. Elsewhere (SQLite) claims are
+    serialized in-process and fall back to compare-and-swap across processes.
+    """
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            order_id = claimable(driver).select_for_update(skip_locked=True).values_list('id', flat=True).first()
+            updated = _assign(order_id, driver) if order_id is not None else 0
+        return order_id if _won(order_id, updated, open_jobs=True) else None
+
+    with _claim_lock:
+        while True:
+            batch = list(claimable(driver).values_list('id', flat=True)[:candidates])
+            if not batch:
+                return None
+            for order_id in batch:
+                if accept(order_id, driver):
+                    return order_id
+
+
+def _deliver_if(other_flag):
+    # Evaluated by the database against the row it is updating, so whichever
+    # confirmation lands second sees the first one and flips the status.
+    return Case(When(**{other_flag: True}, then=Value(DELIVERED)), default=F('status'))
+
+
+def driver_confirm(order_id, driver):
+    """Assigned driver marks the delivery done; delivered once both sides agree."""
+    updated = Order.objects.filter(id=order_id, driver=driver, status=DELIVERING).update(
+        driver_confirmed=True,
+        status=_deliver_if('customer_confirmed'),
+    )
+    return _won(order_id, updated)
+
+
+def customer_confirm(order_id, user):
+    """Customer confirms receipt; delivered once both sides agree."""
+    updated = Order.objects.filter(id=order_id, user=user, status=DELIVERING).update(
+        customer_confirmed=True,
+        status=_deliver_if('driver_confirmed'),
+    )
+    return _won(order_id, updated)
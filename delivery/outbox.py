@@ -0,0 +1,99 @@
+"""Transactional email outbox.
+
+Views call `enqueue_email` inside the transaction that makes the email
+necessary, so the message exists exactly when the change does and the
+request never waits on SMTP. `send_pending` (run by the `send_outbox`
+command) drains the table over one backend connection, retrying failures
+with exponential backoff.
+"""
+from datetime import timedelta
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+PENDING = 'Pending'
+SENT = 'Sent'
+FAILED = 'Failed'
+
+MAX_ATTEMPTS = 5
+RETRY_BASE = timedelta(seconds=30)
+# How long a sender holds a claimed row before another sender may retry it.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def enqueue_email(to_email, subject, body, from_email=None):
+    return EmailOutbox.objects.create(
+        to_email=to_email,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body=body,
+    )
+
+
+def _claim(entry, now):
+    # Compare-and-swap on next_attempt_at so two senders never mail the same row.
+    return EmailOutbox.objects.filter(
+        id=entry.id, status=PENDING, next_attempt_at=entry.next_attempt_at,
+    ).update(next_attempt_at=now + CLAIM_LEASE) == 1
+
+
+def _mark_failed(entry, error, max_attempts):
+    attempts = entry.attempts + 1
+    EmailOutbox.objects.filter(id=entry.id).update(
+        attempts=attempts,
+        last_error=str(error)[:1000],
+        status=FAILED if attempts >= max_attempts else PENDING,
+        next_attempt_at=timezone.now() + RETRY_BASE * 2 ** (attempts - 1),
+    )
+
+
+def _fail_all(entries, error, max_attempts):
+    for entry in entries:
+        _mark_failed(entry, error, max_attempts)
+    return len(entries)
+
+
+def send_pending(batch_size=100, max_attempts=MAX_ATTEMPTS, connection=None):
+    """Send up to `batch_size` due emails over one connection; return (sent, failed)."""
+    now = timezone.now()
+    due = list(
+        EmailOutbox.objects.filter(status=PENDING, next_attempt_at__lte=now).order_by('next_attempt_at', 'id')[:batch_size]
+    )
+    claimed = [entry for entry in due if _claim(entry, now)]
+    if not claimed:
+        return 0, 0
+
+    sent = failed = 0
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except (SMTPException, OSError) as exc:
+        # Server unreachable: count the attempt on every claimed row so they
+        # back off and are retried, instead of sitting leased until the lease lapses.
+        return 0, _fail_all(claimed, exc, max_attempts)
+
+    try:
+        for index, entry in enumerate(claimed):
+            message = EmailMessage(entry.subject, entry.body, entry.from_email, [entry.to_email], connection=connection)
+            try:
+                message.send()
+            except Exception as exc:
+                _mark_failed(entry, exc, max_attempts)
+                failed += 1
+                # The error may have left the session unusable; start a fresh one.
+                try:
+                    connection.close()
+                    connection.open()
+                except (SMTPException, OSError) as exc:
+                    failed += _fail_all(claimed[index + 1:], exc, max_attempts)
+                    break
+                continue
+            EmailOutbox.objects.filter(id=entry.id).update(status=SENT, sent_at=timezone.now(), last_error='')
+            sent += 1
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,18 @@
+from rest_framework.pagination import CursorPagination
+
+
+class DeliveryCursorPagination(CursorPagination):
+    """Opaque keyset cursors with a hard cap on the page size."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class OrderCursorPagination(DeliveryCursorPagination):
+    # `id` breaks ties between orders created in the same instant so the
+    # ordering is total and pages never skip or repeat rows.
+    ordering = ('-created_at', '-id')
+
+
+class RestaurantCursorPagination(DeliveryCursorPagination):
+    ordering = ('id',)
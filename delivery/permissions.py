@@ -0,0 +1,16 @@
+from rest_framework import permissions
+
+from .authentication import get_role
+
+
+class HasRole(permissions.IsAuthenticated):
+    """Authenticated caller whose role (from token claims when present) is `role`."""
+    role = None
+    message = 'Not authorized'
+
+    def has_permission(self, request, view):
+        return super().has_permission(request, view) and get_role(request.user) == self.role
+
+
+class IsDriver(HasRole):
+    role = 'Driver'
@@ -0,0 +1,96 @@
+"""Opt-in per-request profiling for staff.
+
+A staff user who sends ``X-Profile: 1`` or ``?profile=1`` gets that request
+run under cProfile and tracemalloc. The pstats dump and a text summary of the
+hottest functions and largest allocations are written to PROFILING_DIR and
+named in the ``X-Profile-File`` response header. Every other request pays
+for one header and one query-string lookup.
+"""
+import cProfile
+import io
+import pstats
+import re
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .metrics import route_label
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+TOP_FUNCTIONS = 40
+
+# tracemalloc is process-wide, so profiled requests take turns.
+_profile_lock = threading.Lock()
+
+
+def _requesting_user(request):
+    """The session user (admin) or, failing that, the JWT bearer (API)."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def wants_profile(request):
+    if not request.META.get(PROFILE_HEADER) and PROFILE_PARAM not in request.GET:
+        return False
+    user = _requesting_user(request)
+    return user is not None and user.is_staff
+
+
+def write_profile(request, profiler, snapshot):
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', route_label(request)).strip('_')
+    path = directory / f'{stamp}-{request.method.lower()}-{slug}.prof'
+    profiler.dump_stats(path)
+
+    summary = io.StringIO()
+    summary.write(f'{request.method} {request.get_full_path()}\n\n')
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+    summary.write(f'Top {settings.PROFILING_TOP_ALLOCATIONS} allocations by line:\n')
+    for statistic in snapshot.statistics('lineno')[:settings.PROFILING_TOP_ALLOCATIONS]:
+        summary.write(f'  {statistic}\n')
+    path.with_suffix('.txt').write_text(summary.getvalue(), encoding='utf-8')
+    return path
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not wants_profile(request):
+            return self.get_response(request)
+
+        with _profile_lock:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+                snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+
+        path = write_profile(request, profiler, snapshot)
+        response['X-Profile-File'] = path.name
+        return response
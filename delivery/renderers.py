@@ -0,0 +1,66 @@
+import math
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .metrics import measure_render
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _has_non_finite(data):
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    Output is byte-identical to the stock renderer for compact UTF-8 JSON;
+    indented or ASCII-only requests fall back to the standard encoder.
+    """
+    _encoder = JSONEncoder()
+    _options = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson is not None else None
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure_render():
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not api_settings.UNICODE_JSON
+            or not api_settings.COMPACT_JSON
+            or self.get_indent(accepted_media_type or '', renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Dates and dataclasses go through DRF's encoder, which formats
+            # UTC as "Z" and trims datetimes to milliseconds.
+            ret = orjson.dumps(data, default=self._encoder.default, option=self._options)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson writes NaN and infinities as null; the stock renderer refuses
+        # them (or writes them verbatim when not strict), so let it decide.
+        if b'null' in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Match the stock renderer, which escapes these for JavaScript safety.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.db import transaction
 from .models import Restaurant, MenuItem, Order, OrderItem, UserProfile
+from .db_router import use_primary
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,17 +15,64 @@ class UserProfileSerializer(serializers.ModelSerializer):
         model = UserProfile
         fields = ['user', 'role', 'phone_number', 'address', 'license_number', 'vehicle_plate', 'is_available']
 
+def parse_field_list(value):
+    """Split a `?fields=a,b` style query parameter into a list of names."""
+    if not value:
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+def resolve_field_names(names, expandable, fields=None, expand=None):
+    """Which of `names` survive a sparse fieldset request, in declared order.
+
+    Without `fields` every name is kept, so the default payload is unchanged;
+    `expand` adds expandable fields back onto a trimmed `fields` list.
+    """
+    if not fields:
+        return list(names)
+    expand = set(expand or []) & set(expandable)
+    return [name for name in names if name in fields or name in expand]
+
+def requested_fieldset(request):
+    """The `(fields, expand)` lists a request asked for."""
+    return (
+        parse_field_list(request.query_params.get('fields')),
+        parse_field_list(request.query_params.get('expand')),
+    )
+
+class SparseFieldsMixin:
+    """Lets callers trim a serializer with `?fields=` and `?expand=`.
+
+    `?fields=` keeps only the named fields; fields named in
+    `Meta.expandable_fields` can be added back with `?expand=`. Explicit
+    `fields`/`expand` keyword arguments win over the query string.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is not None:
+            requested_fields, requested_expand = requested_fieldset(request)
+            fields = requested_fields if fields is None else fields
+            expand = requested_expand if expand is None else expand
+
+        keep = resolve_field_names(self.fields, getattr(self.Meta, 'expandable_fields', []), fields, expand)
+        for name in set(self.fields) - set(keep):
+            self.fields.pop(name)
+
 class MenuItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = MenuItem
         fields = ['id', 'name', 'description', 'price', 'image']
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     menu_items = MenuItemSerializer(many=True, read_only=True)
     
     class Meta:
         model = Restaurant
         fields = ['id', 'name', 'description', 'cuisine', 'address', 'menu_items']
+        expandable_fields = ['menu_items']
 
 class OrderItemSerializer(serializers.ModelSerializer):
     menu_item_name = serializers.CharField(source='menu_item.name', read_only=True)
@@ -43,9 +91,8 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ['id', 'status', 'total_price', 'created_at', 'items', 'restaurant_name']
         
     def get_restaurant_name(self, obj):
-        first_item = obj.items.first()
-        if first_item:
-            return first_item.menu_item.restaurant.name
+        if obj.restaurant_id:
+            return obj.restaurant.name
         return "Unknown"
 
 class UserRegistrationSerializer(serializers.Serializer):
@@ -65,26 +112,18 @@ class UserRegistrationSerializer(serializers.Serializer):
     bank_account = serializers.CharField(required=False, allow_blank=True)
 
     def create(self, validated_data):
-        user_data = {k: validated_data.get(k) for k in ['username', 'email', 'password']}
-        user = User.objects.create_user(**user_data)
-        
-
-        profile_data = {
-            'role': validated_data.get('role'),
-            'phone_number': validated_data.get('phone_number'),
-            'address': validated_data.get('address'),
-            'license_number': validated_data.get('license_number'),
-            'vehicle_plate': validated_data.get('vehicle_plate'),
-            'vehicle_type': validated_data.get('vehicle_type'),
-            'bank_account': validated_data.get('bank_account'),
-        }
-        
-
-        profile = user.userprofile
-        for attr, value in profile_data.items():
-            if value:
-                setattr(profile, attr, value)
-        profile.save()
+        profile_fields = ['role', 'phone_number', 'address', 'license_number', 'vehicle_plate', 'vehicle_type', 'bank_account']
+
+        user = User(
+            username=User.normalize_username(validated_data['username']),
+            email=User.objects.normalize_email(validated_data['email']),
+        )
+        user.set_password(validated_data['password'])
+        # The post_save receiver creates the profile from these in the same
+        # transaction: one INSERT for the user, one for the profile.
+        user._profile_defaults = {k: validated_data[k] for k in profile_fields if validated_data.get(k)}
+        with transaction.atomic():
+            user.save()
         return user
 
 class CreateOrderSerializer(serializers.Serializer):
@@ -104,8 +143,11 @@ class CreateOrderSerializer(serializers.Serializer):
             except (TypeError, ValueError):
                 raise serializers.ValidationError(f'Invalid menu item id: {item_id}')
 
-        menu_items = MenuItem.objects.filter(id__in=normalized_ids).select_related('restaurant')
-        found_by_id = {item.id: item for item in menu_items}
+        # Prices are charged from these rows, so read them live from the
+        # primary rather than from a cache or a lagging replica.
+        with use_primary():
+            menu_items = MenuItem.objects.filter(id__in=normalized_ids).select_related('restaurant')
+            found_by_id = {item.id: item for item in menu_items}
 
         missing_ids = [str(item_id) for item_id in normalized_ids if item_id not in found_by_id]
         if missing_ids:
@@ -122,9 +164,11 @@ class CreateOrderSerializer(serializers.Serializer):
         menu_items_by_id = items_data.pop('_menu_items_by_id')
         normalized_ids = items_data.pop('_normalized_ids')
 
+        restaurant = menu_items_by_id[normalized_ids[0]].restaurant
+
         total_price = 0
         with transaction.atomic():
-            order = Order.objects.create(user=user, total_price=0)
+            order = Order.objects.create(user=user, restaurant=restaurant, total_price=0)
             order_items = []
 
             for item_id in normalized_ids:
@@ -0,0 +1,159 @@
+"""Slow query log: queries over SLOW_QUERY_THRESHOLD_MS go to an NDJSON file.
+
+Each record carries the SQL, its parameters, the project function that issued
+it (e.g. ``OrderViewSet.get_queryset``) and the database's EXPLAIN plan, so
+missing indexes and runaway querysets show up without reproducing them by
+hand. Records are written by a background thread; the request only pays for
+the EXPLAIN of queries that were already slow.
+"""
+import json
+import queue
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections, transaction
+
+WRITER_QUEUE_SIZE = 1000
+# Frames from these files are plumbing, never "the caller".
+_PLUMBING = {__file__, str(Path(__file__).with_name('metrics.py'))}
+
+_explaining = threading.local()
+
+
+def find_caller():
+    """Qualified name and location of the innermost project frame on the stack."""
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base_dir) and filename not in _PLUMBING and 'site-packages' not in filename:
+            code = frame.f_code
+            location = f'{Path(filename).relative_to(base_dir)}:{frame.f_lineno}'
+            return getattr(code, 'co_qualname', code.co_name), location
+        frame = frame.f_back
+    return None, None
+
+
+def explain(connection, sql, params):
+    """The backend's plan for `sql` as a list of rows, or None if it can't be explained."""
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    _explaining.active = True
+    try:
+        # A savepoint keeps a failed EXPLAIN from poisoning the caller's transaction.
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+    except DatabaseError:
+        return None
+    finally:
+        _explaining.active = False
+
+
+class NDJSONWriter:
+    """Appends records to a file from a daemon thread, dropping them if it falls behind."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.queue = queue.Queue(maxsize=WRITER_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='slow-query-writer', daemon=True)
+                self._thread.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def flush(self):
+        """Block until every queued record is on disk."""
+        self.queue.join()
+
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open('a', encoding='utf-8') as handle:
+                    handle.write(json.dumps(record, default=str) + '\n')
+            except OSError:
+                pass
+            finally:
+                self.queue.task_done()
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path=None):
+    path = str(path or settings.SLOW_QUERY_LOG_FILE)
+    with _writers_lock:
+        if path not in _writers:
+            _writers[path] = NDJSONWriter(path)
+        return _writers[path]
+
+
+class SlowQueryLogger:
+    """`connection.execute_wrapper` that records queries slower than `threshold_ms`."""
+
+    def __init__(self, threshold_ms=None, writer=None):
+        self.threshold = (settings.SLOW_QUERY_THRESHOLD_MS if threshold_ms is None else threshold_ms) / 1000
+        self.writer = writer or get_writer()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_explaining, 'active', False):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= self.threshold:
+            self.log(context['connection'], sql, params, many, duration)
+        return result
+
+    def log(self, connection, sql, params, many, duration):
+        caller, location = find_caller()
+        self.writer.write({
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'database': connection.alias,
+            'sql': sql,
+            # executemany() has already consumed its parameter iterator.
+            'params': None if many else params,
+            'caller': caller,
+            'location': location,
+            'plan': None if many else explain(connection, sql, params),
+        })
+
+
+@contextmanager
+def log_slow_queries(threshold_ms=None, writer=None):
+    """Log slow queries on every database connection inside the block."""
+    logger = SlowQueryLogger(threshold_ms, writer)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(logger))
+        yield logger
+
+
+class SlowQueryLogMiddleware:
+    """Wraps each request in `log_slow_queries`; unloaded when no threshold is set."""
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_THRESHOLD_MS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with log_slow_queries():
+            return self.get_response(request)
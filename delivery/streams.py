@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import ClaimsJWTAuthentication, get_role
+from .events import DRIVERS_CHANNEL, hub, user_channel
+
+KEEPALIVE_SECONDS = 15
+RECONNECT_MILLISECONDS = 3000
+
+
+def _authenticate(request):
+    """Resolve the JWT bearer and the channels that user may listen on."""
+    try:
+        result = ClaimsJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if result is None:
+        return None
+    user = result[0]
+    channels = [user_channel(user.id)]
+    if get_role(user) == 'Driver':
+        channels.append(DRIVERS_CHANNEL)
+    return channels
+
+
+def format_event(event):
+    return f"event: order\nid: {event['id']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def order_event_stream(request):
+    """Server-Sent Events feed of status changes for the caller's orders.
+
+    Needs an ASGI server (see asgi.py); each connected client holds one
+    long-lived request instead of polling the order lists.
+    """
+    channels = await sync_to_async(_authenticate)(request)
+    if channels is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided.'}, status=401)
+
+    async def events():
+        with hub.subscribe(channels) as subscription:
+            yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
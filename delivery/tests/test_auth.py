@@ -2,6 +2,8 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 class AuthTests(APITestCase):
     def test_registration(self):
@@ -40,3 +42,26 @@ class AuthTests(APITestCase):
         user = User.objects.create_user(username='signaluser', password='password123')
         # refresh from db to check if signal created profile
         self.assertTrue(hasattr(user, 'userprofile'))
+
+    def test_registration_writes_user_and_profile_once(self):
+        """Registration inserts the user and a populated profile, with no follow-up updates"""
+        data = {
+            'username': 'newdriver',
+            'email': 'driver@test.com',
+            'password': 'password123',
+            'role': 'Driver',
+            'vehicle_plate': 'AB-123',
+        }
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(reverse('api_register'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        writes = [q['sql'].split()[0] + ' ' + q['sql'].split()[2] for q in captured if q['sql'].startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(writes, ['INSERT "auth_user"', 'INSERT "delivery_userprofile"'])
+        profile = User.objects.get(username='newdriver').userprofile
+        self.assertEqual((profile.role, profile.vehicle_plate), ('Driver', 'AB-123'))
+
+    def test_saving_a_user_leaves_the_profile_alone(self):
+        user = User.objects.create_user(username='testuser', password='password123')
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
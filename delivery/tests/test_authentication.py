@@ -0,0 +1,117 @@
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from delivery.models import Order
+from delivery.throttling import reset_throttles
+
+
+class TokenClaimsTests(APITestCase):
+    def setUp(self):
+        reset_throttles()
+        self.customer = User.objects.create_user(username='customer', email='customer@test.com', password='password123')
+        self.driver = User.objects.create_user(username='driver', password='password123')
+        self.driver.userprofile.role = 'Driver'
+        self.driver.userprofile.save()
+
+    def login(self, username, token='access'):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': username, 'password': 'password123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data[token]
+
+    def refresh(self, refresh):
+        return self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+
+    def test_access_token_carries_role_and_profile(self):
+        token = AccessToken(self.login('driver'))
+        self.assertEqual(token['role'], 'Driver')
+        self.assertEqual(token['profile_id'], self.driver.userprofile.id)
+
+    def test_refresh_tokens_carry_no_claims(self):
+        token = RefreshToken(self.login('driver', token='refresh'))
+        self.assertNotIn('role', token)
+        self.assertNotIn('profile_id', token)
+
+    def test_refresh_picks_up_a_role_change(self):
+        refresh = self.login('customer', token='refresh')
+        self.driver.userprofile.role = 'Customer'
+        self.driver.userprofile.save()
+        self.customer.userprofile.role = 'Driver'
+        self.customer.userprofile.save()
+
+        response = self.refresh(refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'Driver')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.assertEqual(self.client.get(reverse('order-available-jobs')).status_code, status.HTTP_200_OK)
+
+    def test_refresh_is_refused_once_the_user_is_deactivated(self):
+        refresh = self.login('driver', token='refresh')
+        self.driver.is_active = False
+        self.driver.save()
+
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_drops_claims_left_on_old_refresh_tokens(self):
+        legacy = RefreshToken.for_user(self.customer)
+        legacy['role'] = 'Driver'
+        legacy['profile_id'] = self.customer.userprofile.id
+
+        token = AccessToken(self.refresh(str(legacy)).data['access'])
+        self.assertEqual(token['role'], 'Customer')
+
+    def test_registration_tokens_carry_claims(self):
+        response = self.client.post(reverse('api_register'), {
+            'username': 'newdriver', 'email': 'd@test.com', 'password': 'password123', 'role': 'Driver',
+        }, format='json')
+
+        token = AccessToken(response.data['tokens']['access'])
+        self.assertEqual(token['role'], 'Driver')
+        self.assertEqual(token['profile_id'], User.objects.get(username='newdriver').userprofile.id)
+
+    def test_profile_me_returns_the_real_user_for_claims_tokens(self):
+        access = self.login('customer')
+        self.assertIn('role', AccessToken(access))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = self.client.get(reverse('profile-me'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['username'], 'customer')
+        self.assertEqual(response.data['user']['email'], 'customer@test.com')
+
+    def test_driver_actions_run_without_auth_queries(self):
+        order = Order.objects.create(user=self.customer, total_price=10.00)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login("driver")}')
+
+        # Only the order update and the offer cleanup; no user or profile reads.
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('order-accept-job', args=[order.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        order.refresh_from_db()
+        self.assertEqual(order.driver, self.driver)
+
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('profile-availability'), {'is_available': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_customer_is_refused_driver_actions_without_queries(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login("customer")}')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('order-available-jobs'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_tokens_without_claims_fall_back_to_the_profile(self):
+        legacy = RefreshToken.for_user(self.driver).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {legacy}')
+
+        response = self.client.get(reverse('order-available-jobs'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.customer).access_token}')
+        response = self.client.get(reverse('order-available-jobs'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,120 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from delivery.authentication import tokens_for
+from delivery.caching import SkipCache, cached, get_or_set, invalidate_tags
+from delivery.models import MenuItem, Restaurant
+from delivery.throttling import reset_throttles
+
+
+class CachedDecoratorTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.calls = 0
+
+    def compute(self, value='fresh', delay=0):
+        def run():
+            time.sleep(delay)
+            self.calls += 1
+            return value
+        return run
+
+    def test_tag_invalidation_makes_entries_unreachable(self):
+        @cached(tags=lambda restaurant_id: [f'restaurant:{restaurant_id}'])
+        def lookup(restaurant_id):
+            self.calls += 1
+            return restaurant_id
+
+        lookup(1), lookup(1), lookup(2)
+        self.assertEqual(self.calls, 2)
+
+        invalidate_tags('restaurant:1')
+        lookup(1), lookup(2)
+        self.assertEqual(self.calls, 3)
+
+    def test_entries_expire_after_their_ttl(self):
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1000):
+            get_or_set('key', self.compute(), ttl=5)
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1004):
+            get_or_set('key', self.compute(), ttl=5)
+        self.assertEqual(self.calls, 1)
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1006):
+            get_or_set('key', self.compute(), ttl=5)
+        self.assertEqual(self.calls, 2)
+
+    def test_concurrent_misses_compute_once(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_set('hot', self.compute(delay=0.2))))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['fresh'] * 8)
+
+    def test_waits_for_another_process_holding_the_lock(self):
+        cache.add('hot:lock', 1)
+        threading.Timer(0.1, lambda: cache.set('hot', 'from elsewhere')).start()
+
+        self.assertEqual(get_or_set('hot', self.compute()), 'from elsewhere')
+        self.assertEqual(self.calls, 0)
+
+    def test_skipped_values_are_returned_but_not_stored(self):
+        def not_found():
+            self.calls += 1
+            raise SkipCache('missing')
+
+        self.assertEqual(get_or_set('key', not_found), 'missing')
+        self.assertEqual(get_or_set('key', not_found), 'missing')
+        self.assertEqual(self.calls, 2)
+
+
+class CachedLookupTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_throttles()
+        self.customer = User.objects.create_user(username='customer', email='c@test.com', password='password123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for(self.customer)["access"]}')
+
+    def test_profile_is_served_from_cache_until_it_changes(self):
+        url = reverse('profile-me')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data['user']['username'], 'customer')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.data, first.data)
+
+        profile = self.customer.userprofile
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.phone_number = '555-0100'
+            profile.save()
+        self.assertEqual(self.client.get(url).data['phone_number'], '555-0100')
+
+    def test_orders_are_charged_current_prices(self):
+        restaurant = Restaurant.objects.create(name='Resto', description='Desc', address='Addr')
+        item = MenuItem.objects.create(restaurant=restaurant, name='Dish', description='Yum', price=10.00)
+
+        def order():
+            return self.client.post(reverse('order-list'), {'items': {str(item.id): 1}}, format='json')
+
+        self.assertEqual(order().data['total_price'], '10.00')
+        # A queryset update sends no signals, so no cache would hear of it.
+        MenuItem.objects.filter(id=item.id).update(price=12.00)
+        response = order()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['total_price'], '12.00')
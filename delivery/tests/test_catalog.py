@@ -0,0 +1,90 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from delivery.models import Restaurant, MenuItem
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.client.force_authenticate(user=self.customer)
+
+        self.restaurant = Restaurant.objects.create(name="Test Resto", description="Test Desc", address="123 Test St")
+        self.menu_item = MenuItem.objects.create(restaurant=self.restaurant, name="Test Item", description="Yum", price=10.00)
+        self.url = reverse('restaurant-list') + '?expand=menu_items'
+
+    def test_matching_etag_returns_not_modified(self):
+        """Revalidating an unchanged catalog costs no queries and no body"""
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first['ETag']
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second['ETag'], etag)
+
+    def test_cached_body_is_served_without_queries(self):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+
+    def test_menu_change_invalidates_catalog(self):
+        """Saving a menu item bumps the version, the ETag and the body"""
+        first = self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.menu_item.price = 12.50
+            self.menu_item.save()
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.data['results'][0]['menu_items'][0]['price'], '12.50')
+
+    def test_restaurant_delete_invalidates_catalog(self):
+        first = self.client.get(self.url)
+
+        self.restaurant.delete()
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data['results'], [])
+
+    def test_default_payload_includes_menus(self):
+        """Clients that never ask for a fieldset keep getting full restaurants"""
+        response = self.client.get(reverse('restaurant-list'))
+        self.assertEqual(response.data['results'][0]['menu_items'][0]['name'], 'Test Item')
+
+        response = self.client.get(reverse('restaurant-detail', args=[self.restaurant.id]))
+        self.assertEqual(response.data['menu_items'][0]['name'], 'Test Item')
+
+    def test_lean_fieldset_skips_the_menu_query(self):
+        """A ?fields= list without menu_items skips menu items and their prefetch query"""
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('restaurant-list') + '?fields=id,name,cuisine')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('menu_items', response.data['results'][0])
+
+        response = self.client.get(reverse('restaurant-list') + '?fields=id,name&expand=menu_items')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'menu_items'})
+
+    def test_fields_limits_the_payload(self):
+        response = self.client.get(reverse('restaurant-list') + '?fields=id,name')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+    def test_menu_endpoint_returns_one_restaurant_menu(self):
+        other = Restaurant.objects.create(name="Other Resto", description="Desc", address="Addr")
+        MenuItem.objects.create(restaurant=other, name="Other Item", description="Meh", price=5.00)
+
+        response = self.client.get(reverse('restaurant-menu', args=[self.restaurant.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Test Resto')
+        self.assertEqual([i['name'] for i in response.data['menu_items']], ['Test Item'])
+
+    def test_menu_endpoint_unknown_restaurant(self):
+        response = self.client.get(reverse('restaurant-menu', args=[9999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from delivery.caching import get_or_set
+from delivery.db_router import PIN_COOKIE, ReplicaRoutingMiddleware, use_primary
+from delivery.models import Order
+
+
+@override_settings(READ_REPLICAS=['replica1'], PRIMARY_PIN_SECONDS=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.routed_to = None
+
+    def view(self, request):
+        # Only ask where the queries would go; the replica alias isn't configured here.
+        self.routed_to = (Order.objects.all().db, Order.objects.select_for_update().db)
+        return HttpResponse()
+
+    def call(self, request):
+        return ReplicaRoutingMiddleware(self.view)(request)
+
+    def test_safe_requests_read_from_a_replica(self):
+        self.call(self.factory.get('/api/orders/'))
+        self.assertEqual(self.routed_to, ('replica1', 'default'))
+
+    def test_writes_stay_on_the_primary_and_pin_the_client(self):
+        response = self.call(self.factory.post('/api/orders/'))
+        self.assertEqual(self.routed_to, ('default', 'default'))
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 5)
+
+        request = self.factory.get('/api/orders/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.call(request)
+        self.assertEqual(self.routed_to, ('default', 'default'))
+
+    def test_cache_fills_and_use_primary_read_from_the_primary(self):
+        def view(request):
+            with use_primary():
+                primary = User.objects.all().db
+            cached = get_or_set('router-test', lambda: User.objects.all().db, ttl=1)
+            return HttpResponse(f'{primary},{cached}')
+
+        self.addCleanup(cache.delete, 'router-test')
+        response = ReplicaRoutingMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(response.content, b'default,default')
+
+    @override_settings(READ_REPLICAS=[])
+    def test_middleware_is_skipped_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(self.view)
+        self.assertEqual(Order.objects.all().db, 'default')
@@ -0,0 +1,141 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from delivery import order_states
+from delivery.dispatch import DispatchEngine, decline_offer
+from delivery.models import JobOffer, Order
+
+class DispatchEngineTests(APITestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.engine = DispatchEngine(offer_timeout=timedelta(seconds=30), clock=lambda: self.now)
+
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.drivers = []
+        for name in ('driver_a', 'driver_b'):
+            driver = User.objects.create_user(username=name, password='password123')
+            driver.userprofile.role = 'Driver'
+            driver.userprofile.is_available = True
+            driver.userprofile.save()
+            self.drivers.append(driver)
+
+    def make_order(self, minutes_ago=0, total=10):
+        order = Order.objects.create(user=self.customer, total_price=total)
+        Order.objects.filter(id=order.id).update(created_at=self.now - timedelta(minutes=minutes_ago))
+        return order
+
+    def open_offer(self, order):
+        return JobOffer.objects.filter(order=order, status='Offered').first()
+
+    def test_each_driver_gets_one_offer_oldest_first(self):
+        newest = self.make_order(minutes_ago=1)
+        oldest = self.make_order(minutes_ago=10)
+        middle = self.make_order(minutes_ago=5)
+
+        self.assertEqual(self.engine.dispatch_once(), 2)
+
+        self.assertIsNotNone(self.open_offer(oldest))
+        self.assertIsNotNone(self.open_offer(middle))
+        self.assertIsNone(self.open_offer(newest))
+        self.assertEqual(JobOffer.objects.values('driver').distinct().count(), 2)
+
+    def test_value_raises_priority(self):
+        self.drivers[1].userprofile.is_available = False
+        self.drivers[1].userprofile.save()
+        cheap = self.make_order(minutes_ago=1, total=5)
+        pricey = self.make_order(minutes_ago=0, total=500)
+
+        self.engine.dispatch_once()
+
+        self.assertIsNotNone(self.open_offer(pricey))
+        self.assertIsNone(self.open_offer(cheap))
+
+    def test_expired_offer_moves_to_next_driver(self):
+        order = self.make_order()
+        self.engine.dispatch_once()
+        first_driver = self.open_offer(order).driver
+
+        self.now += timedelta(seconds=31)
+        self.engine.dispatch_once()
+
+        offer = self.open_offer(order)
+        self.assertNotEqual(offer.driver, first_driver)
+        self.assertTrue(JobOffer.objects.filter(order=order, driver=first_driver, status='Expired').exists())
+
+    def test_declined_offer_goes_to_another_driver(self):
+        order = self.make_order()
+        self.engine.dispatch_once()
+        first_driver = self.open_offer(order).driver
+
+        self.assertTrue(decline_offer(order.id, first_driver))
+        self.engine.dispatch_once()
+
+        self.assertNotEqual(self.open_offer(order).driver, first_driver)
+
+    def test_offer_is_exclusive_until_it_lapses(self):
+        """Only the offered driver can accept while the offer is open"""
+        order = self.make_order()
+        self.engine.dispatch_once()
+        offered = self.open_offer(order).driver
+        other = next(d for d in self.drivers if d != offered)
+
+        self.assertFalse(order_states.accept(order.id, other))
+        self.assertTrue(order_states.accept(order.id, offered))
+        self.assertEqual(JobOffer.objects.get(order=order).status, 'Accepted')
+
+    def test_offers_endpoint_lists_only_my_offers(self):
+        order = self.make_order()
+        self.engine.dispatch_once()
+        offered = self.open_offer(order).driver
+        other = next(d for d in self.drivers if d != offered)
+
+        self.client.force_authenticate(user=offered)
+        response = self.client.get(reverse('order-offers'))
+        self.assertEqual([o['id'] for o in response.data['results']], [order.id])
+
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(reverse('order-offers')).data['results'], [])
+        self.assertEqual(self.client.get(reverse('order-available-jobs')).data['results'], [])
+
+    def test_cancelled_order_is_withdrawn_from_offers(self):
+        order = self.make_order()
+        self.engine.dispatch_once()
+        offer = self.open_offer(order)
+
+        self.assertTrue(order_states.cancel(order.id, self.customer))
+
+        offer.refresh_from_db()
+        self.assertEqual(offer.status, 'Expired')
+        self.client.force_authenticate(user=offer.driver)
+        self.assertEqual(self.client.get(reverse('order-offers')).data['results'], [])
+
+    def test_offers_skip_orders_no_longer_pending(self):
+        order = self.make_order()
+        self.engine.dispatch_once()
+        offer = self.open_offer(order)
+        # Status changed behind the offer's back, e.g. by the admin.
+        Order.objects.filter(id=order.id).update(status='Cancelled')
+
+        self.client.force_authenticate(user=offer.driver)
+        self.assertEqual(self.client.get(reverse('order-offers')).data['results'], [])
+
+    def test_customers_cannot_decline_offers(self):
+        order = self.make_order()
+        self.client.force_authenticate(user=self.customer)
+
+        response = self.client.post(reverse('order-decline-offer', args=[order.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_drivers_toggle_availability(self):
+        driver = self.drivers[0]
+        self.client.force_authenticate(user=driver)
+
+        response = self.client.post(reverse('profile-availability'), {'is_available': False}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        driver.userprofile.refresh_from_db()
+        self.assertFalse(driver.userprofile.is_available)
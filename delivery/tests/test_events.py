@@ -0,0 +1,84 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from delivery import order_states
+from delivery.events import DRIVERS_CHANNEL, hub, user_channel
+from delivery.models import Order, Restaurant
+
+class OrderEventHubTests(TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.driver = User.objects.create_user(username='driver', password='password123')
+        restaurant = Restaurant.objects.create(name="Test Resto", description="Test Desc", address="123 Test St")
+        self.order = Order.objects.create(user=self.customer, restaurant=restaurant, total_price=10.00)
+
+    def next_event(self, subscription):
+        self.loop.run_until_complete(asyncio.sleep(0))
+        return self.loop.run_until_complete(asyncio.wait_for(subscription.get(), timeout=1))
+
+    def test_transition_is_pushed_to_customer_and_job_board(self):
+        """Accepting a job notifies the customer and every watching driver"""
+        with hub.subscribe([user_channel(self.customer.id)], loop=self.loop) as customer_feed, \
+                hub.subscribe([DRIVERS_CHANNEL], loop=self.loop) as board:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertTrue(order_states.accept(self.order.id, self.driver))
+
+            for feed in (customer_feed, board):
+                event = self.next_event(feed)
+                self.assertEqual(event['id'], self.order.id)
+                self.assertEqual(event['status'], 'Delivering')
+                self.assertEqual(event['restaurant_name'], 'Test Resto')
+
+    def test_other_users_do_not_receive_events(self):
+        stranger = User.objects.create_user(username='stranger', password='password123')
+        with hub.subscribe([user_channel(stranger.id)], loop=self.loop) as feed:
+            with self.captureOnCommitCallbacks(execute=True):
+                order_states.cancel(self.order.id, self.customer)
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.assertTrue(feed.queue.empty())
+
+    def test_slow_subscriber_keeps_latest_events(self):
+        with hub.subscribe(['test'], loop=self.loop) as feed:
+            for i in range(feed.queue.maxsize + 5):
+                hub.publish(['test'], {'id': i})
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.assertEqual(feed.queue.qsize(), feed.queue.maxsize)
+            self.assertEqual(self.next_event(feed)['id'], 5)
+
+    def test_nothing_is_scheduled_without_subscribers(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            order_states.cancel(self.order.id, self.customer)
+        self.assertEqual(callbacks, [])
+
+class OrderEventStreamTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.token = str(RefreshToken.for_user(self.customer).access_token)
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(reverse('order_events'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_delivers_published_events(self):
+        response = await self.async_client.get(
+            reverse('order_events'), headers={'authorization': f'Bearer {self.token}'},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+
+        customer_id = await sync_to_async(lambda: self.customer.id)()
+        hub.publish([user_channel(customer_id)], {'id': 42, 'status': 'Delivered'})
+        chunk = await asyncio.wait_for(anext(stream), timeout=1)
+
+        self.assertIn(b'event: order', chunk)
+        self.assertIn(b'"status": "Delivered"', chunk)
+        await stream.aclose()
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from uuid import UUID
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from django.contrib.auth.models import User
+from delivery import fast_serializers
+from delivery.models import Order, Restaurant, MenuItem, OrderItem
+from delivery.renderers import FastJSONRenderer
+from delivery.serializers import OrderSerializer, RestaurantSerializer
+
+class FastSerializerParityTests(APITestCase):
+    """The fast list path must render byte for byte what the serializers do"""
+
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='password123')
+
+        self.restaurant = Restaurant.objects.create(
+            name="Café \u2028 Ünïcode",
+            description="Line\u2029separated \"quoted\" </script>",
+            cuisine='Italian',
+            address="1 Rue",
+        )
+        self.empty_restaurant = Restaurant.objects.create(name="Empty", description="", address="Nowhere")
+        self.pizza = MenuItem.objects.create(
+            restaurant=self.restaurant, name="Pizza", description="Cheesy", price='12.50',
+            image='menu_images/pizza.png',
+        )
+        self.soup = MenuItem.objects.create(restaurant=self.restaurant, name="Soup", description="Hot", price=7)
+
+        order = Order.objects.create(user=self.customer, restaurant=self.restaurant, total_price='32.50')
+        OrderItem.objects.create(order=order, menu_item=self.pizza, quantity=2, price_at_time='12.50')
+        OrderItem.objects.create(order=order, menu_item=self.soup, quantity=1, price_at_time='7.5')
+        Order.objects.create(user=self.customer, status='Cancelled', total_price=0)
+
+        self.request = Request(APIRequestFactory().get('/api/restaurants/'))
+
+    def assertSameBytes(self, expected, actual):
+        self.assertEqual(JSONRenderer().render(expected), FastJSONRenderer().render(actual))
+
+    def test_orders_match_order_serializer(self):
+        queryset = Order.objects.order_by('-created_at', '-id')
+        expected = OrderSerializer(queryset, many=True).data
+        actual = fast_serializers.serialize_orders(list(fast_serializers.order_rows(queryset)))
+        self.assertSameBytes(expected, actual)
+
+    def test_restaurants_match_restaurant_serializer(self):
+        queryset = Restaurant.objects.order_by('id')
+        for fields, expand in [(None, None), (None, ['menu_items']), (['id', 'name'], None), (['name'], ['menu_items'])]:
+            with self.subTest(fields=fields, expand=expand):
+                expected = RestaurantSerializer(
+                    queryset, many=True, context={'request': self.request}, fields=fields, expand=expand,
+                ).data
+                actual = fast_serializers.serialize_restaurants(
+                    list(fast_serializers.restaurant_rows(queryset)), self.request, fields, expand,
+                )
+                self.assertSameBytes(expected, actual)
+
+    def test_renderer_matches_stock_renderer_on_dates(self):
+        moment = datetime(2024, 5, 6, 7, 8, 9, 123456)
+        data = {
+            'naive': moment,
+            'utc': moment.replace(tzinfo=dt_timezone.utc),
+            'offset': moment.replace(tzinfo=dt_timezone(timedelta(hours=2))),
+            'whole_second': moment.replace(microsecond=0, tzinfo=dt_timezone.utc),
+            'date': moment.date(),
+            'time': moment.time(),
+            'decimal': Decimal('12.50'),
+            'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+        }
+        self.assertEqual(JSONRenderer().render(data), FastJSONRenderer().render(data))
+
+    def test_renderer_refuses_non_finite_floats_like_stock_renderer(self):
+        for value in (float('nan'), float('inf'), float('-inf')):
+            data = {'items': [{'price': value, 'image': None}]}
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render(data)
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render(data)
+        data = {'price': 1.5, 'image': None}
+        self.assertEqual(JSONRenderer().render(data), FastJSONRenderer().render(data))
+
+    def test_renderer_matches_stock_renderer(self):
+        data = {'text': "a\u2028b\u2029c", 'nested': [{'n': 1}, None, True], 'empty': {}}
+        self.assertEqual(JSONRenderer().render(data), FastJSONRenderer().render(data))
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from delivery.models import IdempotencyKey, Order, Restaurant, MenuItem
+
+class IdempotentOrderTests(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.client.force_authenticate(user=self.customer)
+
+        restaurant = Restaurant.objects.create(name="Test Resto", description="Test Desc", address="123 Test St")
+        self.menu_item = MenuItem.objects.create(restaurant=restaurant, name="Test Item", description="Yum", price=10.00)
+        self.url = reverse('order-list')
+        self.payload = {'items': {str(self.menu_item.id): 2}}
+
+    def post(self, key, payload=None):
+        return self.client.post(self.url, payload or self.payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_order(self):
+        """A retried request gets the stored 201 instead of a second order"""
+        first = self.post('checkout-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(1):
+            second = self.post('checkout-1')
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_different_payload_is_rejected(self):
+        self.post('checkout-1')
+        response = self.post('checkout-1', {'items': {str(self.menu_item.id): 5}})
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        self.post('shared-key')
+
+        other = User.objects.create_user(username='other', password='password123')
+        self.client.force_authenticate(user=other)
+        response = self.post('shared-key')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_expired_key_creates_a_new_order(self):
+        self.post('checkout-1')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self.post('checkout-1')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_failed_request_does_not_store_the_key(self):
+        response = self.post('checkout-1', {'items': {'9999': 1}})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        self.assertEqual(self.post('checkout-1').status_code, status.HTTP_201_CREATED)
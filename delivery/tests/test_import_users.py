@@ -0,0 +1,57 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        User.objects.create_user(username='taken', password='password123')
+
+    def run_import(self, name, content, **options):
+        path = self.dir / name
+        path.write_text(content)
+        call_command('import_users', str(path), workers=1, batch_size=2, stdout=StringIO(), **options)
+        return path
+
+    def test_csv_rows_are_imported_with_profiles(self):
+        path = self.run_import('users.csv', (
+            'username,email,password,role,vehicle_plate\n'
+            'driver1,d1@test.com,password123,Driver,AB-123\n'
+            'customer1,c1@test.com,,,\n'
+            'customer2,c2@test.com,password123,Customer,\n'
+        ))
+
+        driver = User.objects.get(username='driver1')
+        self.assertTrue(driver.check_password('password123'))
+        self.assertEqual((driver.userprofile.role, driver.userprofile.vehicle_plate), ('Driver', 'AB-123'))
+        customer = User.objects.get(username='customer1')
+        self.assertFalse(customer.has_usable_password())
+        self.assertEqual(customer.userprofile.role, 'Customer')
+        self.assertTrue(User.objects.filter(username='customer2').exists())
+        self.assertFalse(Path(f'{path}.errors.ndjson').exists())
+
+    def test_bad_rows_are_written_to_the_error_file(self):
+        path = self.run_import('users.ndjson', '\n'.join([
+            json.dumps({'username': 'new1', 'email': 'n1@test.com', 'password': 'password123'}),
+            json.dumps({'username': 'taken', 'email': 't@test.com', 'password': 'password123'}),
+            'not json',
+            json.dumps({'username': 'new1', 'email': 'n2@test.com', 'password': 'password123'}),
+            json.dumps({'username': 'new2', 'email': 'bad', 'role': 'Pilot'}),
+        ]) + '\n')
+
+        self.assertEqual(list(User.objects.filter(username__startswith='new').values_list('username', flat=True)), ['new1'])
+        errors = [json.loads(line) for line in Path(f'{path}.errors.ndjson').read_text().splitlines()]
+        self.assertEqual([error['line'] for error in errors], [2, 3, 4, 5])
+        self.assertIn('already exists', errors[0]['errors']['username'][0])
+        self.assertIn('row', errors[1]['errors'])
+        self.assertIn('Duplicate', errors[2]['errors']['username'][0])
+        self.assertEqual(set(errors[3]['errors']), {'email', 'role'})
@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from delivery.metrics import reset_metrics
+from delivery.models import Order
+
+
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.client.force_authenticate(user=self.customer)
+
+    def server_timing(self, response):
+        metrics = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_reports_total_db_and_render(self):
+        Order.objects.create(user=self.customer, total_price=10.00)
+
+        response = self.client.get(reverse('order-list'))
+
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'total', 'db', 'render'})
+        self.assertEqual(timing['db']['desc'], '"2 queries"')
+        self.assertGreater(float(timing['render']['dur']), 0)
+        self.assertGreaterEqual(float(timing['total']['dur']), float(timing['db']['dur']))
+
+    def test_metrics_endpoint_exposes_per_route_histograms(self):
+        self.client.get(reverse('order-list'))
+        self.client.get(reverse('order-list'))
+        self.client.get('/no/such/page/')
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="order-list"} 2', body)
+        self.assertIn('http_request_db_queries_bucket{method="GET",route="order-list",le="+Inf"} 2', body)
+        self.assertIn('route="<unmatched>"', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1'])
+    def test_metrics_endpoint_is_limited_to_allowed_clients(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,115 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from delivery import order_states
+from delivery.models import Order
+
+class OrderStateTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.driver = User.objects.create_user(username='driver', password='password123')
+        self.other_driver = User.objects.create_user(username='other_driver', password='password123')
+
+    def test_accept_only_wins_once(self):
+        order = Order.objects.create(user=self.customer, total_price=10.00)
+
+        self.assertTrue(order_states.accept(order.id, self.driver))
+        self.assertFalse(order_states.accept(order.id, self.other_driver))
+
+        order.refresh_from_db()
+        self.assertEqual(order.driver, self.driver)
+        self.assertEqual(order.status, order_states.DELIVERING)
+
+    def test_cancel_requires_owner_and_pending(self):
+        order = Order.objects.create(user=self.customer, total_price=10.00)
+
+        self.assertFalse(order_states.cancel(order.id, self.driver))
+        self.assertTrue(order_states.cancel(order.id, self.customer))
+        self.assertFalse(order_states.cancel(order.id, self.customer))
+        self.assertEqual(Order.objects.get(id=order.id).status, order_states.CANCELLED)
+
+    def test_confirmations_deliver_in_either_order(self):
+        first = Order.objects.create(user=self.customer, driver=self.driver, status='Delivering', total_price=10.00)
+        second = Order.objects.create(user=self.customer, driver=self.driver, status='Delivering', total_price=10.00)
+
+        self.assertTrue(order_states.customer_confirm(first.id, self.customer))
+        self.assertTrue(order_states.driver_confirm(first.id, self.driver))
+        self.assertTrue(order_states.driver_confirm(second.id, self.driver))
+        self.assertTrue(order_states.customer_confirm(second.id, self.customer))
+
+        for order in (first, second):
+            order.refresh_from_db()
+            self.assertEqual(order.status, order_states.DELIVERED)
+
+    def test_driver_cannot_confirm_someone_elses_job(self):
+        order = Order.objects.create(user=self.customer, driver=self.driver, status='Delivering', total_price=10.00)
+        self.assertFalse(order_states.driver_confirm(order.id, self.other_driver))
+
+class OrderStateConcurrencyTests(TransactionTestCase):
+    """Parallel confirmations against the same orders never lose the Delivered switch"""
+
+    ORDERS = 25
+
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.driver = User.objects.create_user(username='driver', password='password123')
+
+    def run_in_parallel(self, calls):
+        barrier = threading.Barrier(len(calls))
+        errors = []
+
+        def worker(call):
+            try:
+                barrier.wait()
+                call()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(call,)) for call in calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_parallel_confirmations(self):
+        orders = [
+            Order.objects.create(user=self.customer, driver=self.driver, status='Delivering', total_price=10.00)
+            for _ in range(self.ORDERS)
+        ]
+
+        for order in orders:
+            self.run_in_parallel([
+                lambda: order_states.driver_confirm(order.id, self.driver),
+                lambda: order_states.customer_confirm(order.id, self.customer),
+            ])
+
+        self.assertEqual(Order.objects.filter(status=order_states.DELIVERED).count(), self.ORDERS)
+
+    def test_parallel_accepts_have_a_single_winner(self):
+        drivers = [User.objects.create_user(username=f'driver{i}', password='password123') for i in range(8)]
+        order = Order.objects.create(user=self.customer, total_price=10.00)
+        wins = []
+
+        self.run_in_parallel([
+            (lambda d=driver: wins.append(order_states.accept(order.id, d))) for driver in drivers
+        ])
+
+        self.assertEqual(wins.count(True), 1)
+
+    def test_parallel_claims_never_share_an_order(self):
+        drivers = [User.objects.create_user(username=f'claimer{i}', password='password123') for i in range(6)]
+        orders = [Order.objects.create(user=self.customer, total_price=10.00) for _ in range(4)]
+        claimed = []
+
+        self.run_in_parallel([
+            (lambda d=driver: claimed.append(order_states.claim_next(d))) for driver in drivers
+        ])
+
+        won = [order_id for order_id in claimed if order_id is not None]
+        self.assertEqual(sorted(won), sorted(o.id for o in orders))
+        self.assertEqual(claimed.count(None), 2)
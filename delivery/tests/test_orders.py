@@ -45,6 +45,13 @@ class OrderTests(APITestCase):
         self.assertEqual(Order.objects.count(), 1)
         self.assertEqual(Order.objects.first().total_price, 20.00)
 
+    def test_drivers_can_place_and_cancel_their_own_orders(self):
+        response = self.driver_client.post(reverse('order-list'), {'items': {str(self.menu_item.id): 1}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.driver_client.post(reverse('order-cancel', args=[response.data['id']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_driver_accept_job(self):
         """Test driver accepting a job"""
         # Create pending order
@@ -91,3 +98,66 @@ class OrderTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Order.objects.count(), 0)
+
+    def test_create_order_records_restaurant(self):
+        """The order remembers which restaurant it was placed with"""
+        url = reverse('order-list')
+        response = self.customer_client.post(url, {'items': {str(self.menu_item.id): 1}}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['restaurant_name'], 'Test Resto')
+        self.assertEqual(Order.objects.get().restaurant, self.restaurant)
+
+    def test_order_list_query_count_is_constant(self):
+        """Listing orders must not issue a query per order"""
+        def make_orders(count):
+            for _ in range(count):
+                order = Order.objects.create(user=self.customer, restaurant=self.restaurant, total_price=10.00)
+                OrderItem.objects.create(order=order, menu_item=self.menu_item, price_at_time=10.00)
+
+        url = reverse('order-list')
+        make_orders(2)
+        with self.assertNumQueries(2):
+            self.customer_client.get(url)
+
+        make_orders(15)
+        with self.assertNumQueries(2):
+            response = self.customer_client.get(url)
+        self.assertEqual(response.data['results'][0]['restaurant_name'], 'Test Resto')
+
+        with self.assertNumQueries(2):
+            self.driver_client.get(reverse('order-available-jobs'))
+
+    def test_driver_sees_own_jobs_and_open_pending_orders(self):
+        """Drivers see their deliveries plus unassigned pending orders only"""
+        other_driver = User.objects.create_user(username='other_driver', password='password123')
+        mine = Order.objects.create(user=self.customer, driver=self.driver, status='Delivering', total_price=10.00)
+        pending = Order.objects.create(user=self.customer, total_price=10.00)
+        Order.objects.create(user=self.customer, driver=other_driver, status='Delivering', total_price=10.00)
+        Order.objects.create(user=self.customer, status='Cancelled', total_price=10.00)
+
+        response = self.driver_client.get(reverse('order-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([o['id'] for o in response.data['results']], [pending.id, mine.id])
+
+    def test_claim_next_job_takes_the_oldest_order(self):
+        """Drivers are handed the oldest open order without choosing one"""
+        oldest = Order.objects.create(user=self.customer, total_price=10.00)
+        Order.objects.create(user=self.customer, total_price=10.00)
+
+        response = self.driver_client.post(reverse('order-claim-next-job'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], oldest.id)
+        oldest.refresh_from_db()
+        self.assertEqual(oldest.driver, self.driver)
+        self.assertEqual(oldest.status, 'Delivering')
+
+    def test_claim_next_job_when_nothing_is_open(self):
+        response = self.driver_client.post(reverse('order-claim-next-job'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.customer_client.post(reverse('order-claim-next-job'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
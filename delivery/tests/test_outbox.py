@@ -0,0 +1,108 @@
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
+
+from django.core import mail
+from django.core.management import call_command
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from delivery.models import EmailOTP, EmailOutbox
+from delivery.outbox import enqueue_email, send_pending
+
+
+class FlakyBackend(EmailBackend):
+    """locmem backend that refuses one address and counts connections opened."""
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if 'refused@' in message.to[0]:
+                raise SMTPRecipientsRefused({message.to[0]: (550, b'No such user')})
+        return super().send_messages(messages)
+
+
+class DownBackend(EmailBackend):
+    """locmem backend whose server refuses connections."""
+
+    def open(self):
+        raise ConnectionRefusedError('Connection refused')
+
+
+class SendOTPOutboxTests(APITestCase):
+    def test_otp_email_is_queued_not_sent(self):
+        response = self.client.post(reverse('send_otp'), {'email': 'new@test.com'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mail.outbox, [])
+        otp = EmailOTP.objects.get(email='new@test.com')
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.to_email, 'new@test.com')
+        self.assertIn(otp.otp_code, queued.body)
+
+
+@override_settings(EMAIL_BACKEND='delivery.tests.test_outbox.FlakyBackend')
+class SendPendingTests(TestCase):
+    def setUp(self):
+        FlakyBackend.opened = 0
+
+    def test_batch_is_sent_over_one_connection(self):
+        for i in range(3):
+            enqueue_email(f'user{i}@test.com', 'Hello', 'Body')
+
+        self.assertEqual(send_pending(), (3, 0))
+
+        self.assertEqual(FlakyBackend.opened, 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['user0@test.com', 'user1@test.com', 'user2@test.com'])
+        self.assertFalse(EmailOutbox.objects.exclude(status='Sent').exists())
+        self.assertEqual(send_pending(), (0, 0))
+
+    def test_failures_back_off_then_give_up(self):
+        refused = enqueue_email('refused@test.com', 'Hello', 'Body')
+        enqueue_email('ok@test.com', 'Hello', 'Body')
+
+        self.assertEqual(send_pending(max_attempts=2), (1, 1))
+        refused.refresh_from_db()
+        self.assertEqual((refused.status, refused.attempts), ('Pending', 1))
+        self.assertGreater(refused.next_attempt_at, timezone.now())
+        self.assertIn('No such user', refused.last_error)
+
+        # Not due yet, so nothing is retried until the backoff passes.
+        self.assertEqual(send_pending(max_attempts=2), (0, 0))
+        EmailOutbox.objects.filter(id=refused.id).update(next_attempt_at=timezone.now())
+
+        self.assertEqual(send_pending(max_attempts=2), (0, 1))
+        refused.refresh_from_db()
+        self.assertEqual((refused.status, refused.attempts), ('Failed', 2))
+        self.assertEqual([m.to[0] for m in mail.outbox], ['ok@test.com'])
+
+
+@override_settings(EMAIL_BACKEND='delivery.tests.test_outbox.DownBackend')
+class ServerDownTests(TestCase):
+    def test_unreachable_server_backs_off_the_claimed_rows(self):
+        enqueue_email('a@test.com', 'Hello', 'Body')
+        enqueue_email('b@test.com', 'Hello', 'Body')
+
+        self.assertEqual(send_pending(), (0, 2))
+
+        for entry in EmailOutbox.objects.all():
+            self.assertEqual((entry.status, entry.attempts), ('Pending', 1))
+            self.assertIn('Connection refused', entry.last_error)
+            self.assertGreater(entry.next_attempt_at, timezone.now())
+        self.assertEqual(mail.outbox, [])
+
+    def test_sender_keeps_running_when_the_server_is_down(self):
+        enqueue_email('a@test.com', 'Hello', 'Body')
+        out = StringIO()
+
+        call_command('send_outbox', once=True, stdout=out)
+
+        self.assertIn('Sent 0 email(s), 1 failed', out.getvalue())
+        self.assertEqual(EmailOutbox.objects.get().attempts, 1)
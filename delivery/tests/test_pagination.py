@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from delivery.models import Order, Restaurant
+from delivery.pagination import RestaurantCursorPagination
+
+class PaginationTests(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='password123')
+
+        self.driver = User.objects.create_user(username='driver', password='password123')
+        self.driver.userprofile.role = 'Driver'
+        self.driver.userprofile.save()
+
+        self.customer_client = self.client_class()
+        self.customer_client.force_authenticate(user=self.customer)
+
+        self.driver_client = self.client_class()
+        self.driver_client.force_authenticate(user=self.driver)
+
+    def walk(self, client, url):
+        """Follow `next` cursors and collect every result id."""
+        ids = []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_order_list_walks_every_order_newest_first(self):
+        """Cursors cover the whole history without gaps or repeats"""
+        orders = [Order.objects.create(user=self.customer, total_price=10.00) for _ in range(7)]
+
+        ids = self.walk(self.customer_client, reverse('order-list') + '?page_size=3')
+
+        expected = [o.id for o in sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)]
+        self.assertEqual(ids, expected)
+
+    def test_page_size_is_capped(self):
+        """Clients cannot ask for more than max_page_size rows at once"""
+        for i in range(3):
+            Restaurant.objects.create(name=f"Resto {i}", description="Desc", address="Addr")
+
+        with mock.patch.object(RestaurantCursorPagination, 'max_page_size', 2):
+            response = self.customer_client.get(reverse('restaurant-list') + '?page_size=100000')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_restaurants_are_paginated_by_id(self):
+        restaurants = [
+            Restaurant.objects.create(name=f"Resto {i}", description="Desc", address="Addr")
+            for i in range(5)
+        ]
+
+        ids = self.walk(self.customer_client, reverse('restaurant-list') + '?page_size=2')
+        self.assertEqual(ids, [r.id for r in restaurants])
+
+    def test_available_jobs_are_paginated(self):
+        for _ in range(4):
+            Order.objects.create(user=self.customer, total_price=10.00)
+        Order.objects.create(user=self.customer, driver=self.driver, status='Delivering', total_price=10.00)
+
+        ids = self.walk(self.driver_client, reverse('order-available-jobs') + '?page_size=3')
+        self.assertEqual(len(ids), 4)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.customer_client.get(reverse('order-list') + '?cursor=garbage')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
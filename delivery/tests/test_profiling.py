@@ -0,0 +1,51 @@
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.profile_dir = Path(directory.name)
+        settings_override = override_settings(PROFILING_DIR=str(self.profile_dir))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        self.customer = User.objects.create_user(username='customer', password='password123')
+
+    def bearer(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def test_staff_api_request_is_profiled_on_header(self):
+        response = self.client.get(reverse('order-list'), HTTP_X_PROFILE='1', **self.bearer(self.staff))
+
+        self.assertEqual(response.status_code, 200)
+        profile = self.profile_dir / response['X-Profile-File']
+        self.assertTrue(profile.exists())
+        self.assertIn('order-list', profile.name)
+        summary = profile.with_suffix('.txt').read_text()
+        self.assertIn('GET /api/orders/', summary)
+        self.assertIn('allocations by line', summary)
+
+    def test_staff_admin_request_is_profiled_on_query_param(self):
+        self.client.force_login(self.staff)
+
+        response = self.client.get(reverse('admin:index') + '?profile=1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue((self.profile_dir / response['X-Profile-File']).exists())
+
+    def test_non_staff_and_unflagged_requests_are_not_profiled(self):
+        response = self.client.get(reverse('order-list'), HTTP_X_PROFILE='1', **self.bearer(self.customer))
+        self.assertNotIn('X-Profile-File', response)
+
+        response = self.client.get(reverse('order-list'), **self.bearer(self.staff))
+        self.assertNotIn('X-Profile-File', response)
+
+        self.assertEqual(list(self.profile_dir.iterdir()), [])
@@ -0,0 +1,31 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from delivery.models import EmailOTP
+
+
+class PurgeOTPsTests(TestCase):
+    def make_otp(self, email, expires_in, is_verified=False):
+        return EmailOTP.objects.create(
+            email=email, otp_code='123456', expires_at=timezone.now() + expires_in, is_verified=is_verified,
+        )
+
+    def test_only_live_codes_survive(self):
+        self.make_otp('expired1@test.com', timedelta(minutes=-10))
+        self.make_otp('expired2@test.com', timedelta(minutes=-1))
+        # Expired and verified: removed by the expired pass, counted once.
+        self.make_otp('expired3@test.com', timedelta(minutes=-5), is_verified=True)
+        self.make_otp('verified1@test.com', timedelta(minutes=4), is_verified=True)
+        self.make_otp('verified2@test.com', timedelta(minutes=2), is_verified=True)
+        live = self.make_otp('live@test.com', timedelta(minutes=5))
+        out = StringIO()
+
+        # One row per statement, so each pass has to loop.
+        call_command('purge_otps', batch_size=1, stdout=out)
+
+        self.assertEqual(list(EmailOTP.objects.values_list('id', flat=True)), [live.id])
+        self.assertIn('Deleted 3 expired and 2 verified OTP codes', out.getvalue())
@@ -0,0 +1,125 @@
+import json
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from delivery.catalog import bump_catalog_version
+from delivery.models import MenuItem, Order, OrderItem, Restaurant
+
+BUDGETS_FILE = Path(__file__).with_name('query_budgets.json')
+MENU_SIZE = 5
+TIMED_RUNS = 3
+
+
+class QueryBudgetTests(APITestCase):
+    """Every hot endpoint stays within the query and time budgets in query_budgets.json.
+
+    Datasets grow through each size in the file and query counts must not grow
+    with them; a new per-row query shows up as a budget overrun at the larger
+    sizes. Raise a budget only alongside the change that needs it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.budgets = json.loads(BUDGETS_FILE.read_text())
+
+        cls.customer = User.objects.create_user(username='customer', password='password123')
+        cls.driver = User.objects.create_user(username='driver', password='password123')
+        cls.driver.userprofile.role = 'Driver'
+        cls.driver.userprofile.save()
+
+    def setUp(self):
+        self.customer_client = self.client_class()
+        self.customer_client.force_authenticate(user=self.customer)
+        self.driver_client = self.client_class()
+        self.driver_client.force_authenticate(user=self.driver)
+
+    def grow_to(self, size):
+        """Top up to `size` restaurants and `size` customer orders, half delivered by the driver."""
+        restaurants = Restaurant.objects.bulk_create([
+            Restaurant(name=f'Restaurant {i}', address='1 Test St')
+            for i in range(Restaurant.objects.count(), size)
+        ])
+        MenuItem.objects.bulk_create([
+            MenuItem(restaurant=restaurant, name=f'Dish {i}', price=Decimal('10.00'))
+            for restaurant in restaurants
+            for i in range(MENU_SIZE)
+        ])
+        self.menu_item = MenuItem.objects.order_by('id').first()
+
+        missing = size - Order.objects.filter(user=self.customer).count()
+        orders = Order.objects.bulk_create(
+            [Order(user=self.customer, restaurant=self.menu_item.restaurant, total_price=10) for _ in range(missing // 2)]
+            + [Order(user=self.customer, driver=self.driver, restaurant=self.menu_item.restaurant,
+                     status='Delivered', total_price=10) for _ in range(missing - missing // 2)]
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menu_item=self.menu_item, quantity=1, price_at_time=10) for order in orders
+        ])
+
+    def pending_order(self):
+        return Order.objects.create(user=self.customer, restaurant=self.menu_item.restaurant, total_price=10)
+
+    def endpoints(self):
+        """name -> callable issuing one request; setup work happens outside the callable."""
+        def cold(client, url):
+            # Catalog responses are cached; measure the path that hits the database.
+            def call():
+                bump_catalog_version()
+                return client.get(url)
+            return call
+
+        def get(client, url):
+            return lambda: client.get(url)
+
+        def post(client, url, data=None):
+            return lambda: client.post(url, data, format='json')
+
+        return {
+            'restaurant_list': lambda: cold(self.customer_client, reverse('restaurant-list') + '?fields=id,name,cuisine,description'),
+            'restaurant_list_expanded': lambda: cold(self.customer_client, reverse('restaurant-list')),
+            'customer_orders': lambda: get(self.customer_client, reverse('order-list')),
+            'driver_orders': lambda: get(self.driver_client, reverse('order-list')),
+            'available_jobs': lambda: get(self.driver_client, reverse('order-available-jobs')),
+            'order_create': lambda: post(self.customer_client, reverse('order-list'), {'items': {str(self.menu_item.id): 2}}),
+            'accept_job': lambda: post(self.driver_client, reverse('order-accept-job', args=[self.pending_order().id])),
+            # Runs after accept_job, which leaves this driver orders to deliver.
+            'complete_job': lambda: post(self.driver_client, reverse('order-complete-job', args=[
+                Order.objects.filter(driver=self.driver, status='Delivering', driver_confirmed=False).latest('id').id,
+            ])),
+        }
+
+    def measure(self, make_call):
+        """Return (queries, best wall time in ms) over a few runs of fresh calls."""
+        queries, best = None, None
+        for _ in range(TIMED_RUNS):
+            call = make_call()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = call()
+                elapsed = (time.perf_counter() - start) * 1000
+            self.assertLess(response.status_code, status.HTTP_400_BAD_REQUEST, response.content)
+            queries = max(queries or 0, len(captured))
+            best = elapsed if best is None else min(best, elapsed)
+        return queries, best
+
+    def test_endpoints_stay_within_budget(self):
+        budgets = self.budgets['endpoints']
+        endpoints = self.endpoints()
+        self.assertEqual(set(endpoints), set(budgets), 'query_budgets.json and the endpoint list are out of sync')
+
+        for size in self.budgets['dataset_sizes']:
+            self.grow_to(size)
+            for name, make_call in endpoints.items():
+                queries, elapsed = self.measure(make_call)
+                budget = budgets[name]
+                with self.subTest(endpoint=name, size=size):
+                    self.assertLessEqual(queries, budget['max_queries'], f'{name} at {size} rows: {queries} queries')
+                    self.assertLessEqual(elapsed, budget['max_ms'], f'{name} at {size} rows: {elapsed:.1f} ms')
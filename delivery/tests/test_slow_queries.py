@@ -0,0 +1,51 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from delivery.models import Order
+from delivery.slow_queries import NDJSONWriter, get_writer, log_slow_queries
+
+
+class SlowQueryLogTests(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log_file = Path(directory.name) / 'slow.ndjson'
+
+        self.customer = User.objects.create_user(username='customer', password='password123')
+        self.client.force_authenticate(user=self.customer)
+        Order.objects.create(user=self.customer, total_price=10.00)
+
+    def records(self, writer):
+        writer.flush()
+        if not self.log_file.exists():
+            return []
+        return [json.loads(line) for line in self.log_file.read_text().splitlines()]
+
+    def test_slow_query_is_logged_with_caller_and_plan(self):
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001, SLOW_QUERY_LOG_FILE=str(self.log_file)):
+            self.client.get(reverse('order-list'))
+            records = self.records(get_writer())
+
+        listing = next(r for r in records if 'delivery_order' in r['sql'] and 'ORDER BY' in r['sql'])
+        self.assertEqual(listing['caller'], 'OrderViewSet.list')
+        self.assertTrue(listing['location'].startswith('delivery/api_views.py:'))
+        self.assertEqual(listing['params'][0], self.customer.id)
+        self.assertTrue(listing['plan'])
+        self.assertGreater(listing['duration_ms'], 0)
+
+    def test_queries_under_the_threshold_are_not_logged(self):
+        writer = NDJSONWriter(self.log_file)
+        with log_slow_queries(threshold_ms=60_000, writer=writer):
+            list(Order.objects.all())
+        self.assertEqual(self.records(writer), [])
+
+    def test_log_is_off_without_a_threshold(self):
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG_FILE=str(self.log_file)):
+            self.client.get(reverse('order-list'))
+            self.assertEqual(self.records(get_writer()), [])
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from delivery.throttling import LoginUsernameThrottle, reset_throttles
+
+
+def rates(**overrides):
+    rest = dict(settings.REST_FRAMEWORK)
+    rest['DEFAULT_THROTTLE_RATES'] = {**rest['DEFAULT_THROTTLE_RATES'], **overrides}
+    return override_settings(REST_FRAMEWORK=rest)
+
+
+class AuthThrottleTests(APITestCase):
+    def setUp(self):
+        reset_throttles()
+        self.addCleanup(reset_throttles)
+
+    def login(self, username, **extra):
+        return self.client.post(reverse('token_obtain_pair'), {'username': username, 'password': 'wrong'}, format='json', **extra)
+
+    @rates(login_username='2/min')
+    def test_login_is_limited_per_username_before_hashing(self):
+        self.assertEqual(self.login('alice').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login('Alice ').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with self.assertNumQueries(0):
+            response = self.login('alice', REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+        self.assertEqual(self.login('bob').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @rates(login_ip='2/min')
+    def test_login_is_limited_per_ip(self):
+        self.login('alice')
+        self.login('bob')
+        self.assertEqual(self.login('carol').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login('carol', REMOTE_ADDR='10.0.0.9').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @rates(login_ip='2/min')
+    def test_forwarded_for_header_does_not_reset_the_ip_count(self):
+        self.login('alice', HTTP_X_FORWARDED_FOR='1.1.1.1')
+        self.login('bob', HTTP_X_FORWARDED_FOR='2.2.2.2')
+        response = self.login('carol', HTTP_X_FORWARDED_FOR='3.3.3.3')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(otp_email='1/hour', otp_verify_email='1/hour')
+    def test_otp_endpoints_are_limited_per_email(self):
+        send = lambda email: self.client.post(reverse('send_otp'), {'email': email}, format='json')
+        verify = lambda email: self.client.post(reverse('verify_otp'), {'email': email, 'otp': '000000'}, format='json')
+
+        self.assertEqual(send('a@test.com').status_code, status.HTTP_200_OK)
+        self.assertEqual(send('A@test.com').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(send('b@test.com').status_code, status.HTTP_200_OK)
+
+        self.assertNotEqual(verify('a@test.com').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(verify('a@test.com').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def setUp(self):
+        reset_throttles()
+        self.addCleanup(reset_throttles)
+        self.request = mock.Mock(data={'username': 'alice'})
+
+    def allowed_at(self, now):
+        throttle = LoginUsernameThrottle()
+        with mock.patch('delivery.throttling.time.time', return_value=now):
+            return throttle.allow_request(self.request, None), throttle.wait()
+
+    @rates(login_username='4/min')
+    def test_previous_window_counts_in_proportion_to_its_overlap(self):
+        for _ in range(4):
+            self.assertTrue(self.allowed_at(6000 + 50)[0])
+        # The current window alone is full: wait for the next one.
+        self.assertEqual(self.allowed_at(6000 + 59), (False, 1.0))
+
+        # 15 s into the next window, 3/4 of the old window still overlaps:
+        # 4 * 0.75 = 3 < 4, so exactly one more request fits, and the next
+        # one fits as soon as the old window has decayed a little further.
+        self.assertTrue(self.allowed_at(6060 + 15)[0])
+        allowed, wait = self.allowed_at(6060 + 15)
+        self.assertFalse(allowed)
+        self.assertLess(wait, 1)
+        self.assertTrue(self.allowed_at(6060 + 16)[0])
+
+        # Once the old window has slid out entirely, only the new one counts.
+        self.assertTrue(self.allowed_at(6120 + 1)[0])
+
+    @rates(login_username='2/min')
+    @override_settings(THROTTLE_BACKEND='cache')
+    def test_shared_cache_backend(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.assertTrue(self.allowed_at(6000)[0])
+        self.assertTrue(self.allowed_at(6001)[0])
+        self.assertFalse(self.allowed_at(6002)[0])
+        reset_throttles()
+        self.assertFalse(self.allowed_at(6003)[0])
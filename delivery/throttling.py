@@ -0,0 +1,181 @@
+"""Sliding-window throttles for the unauthenticated auth endpoints.
+
+Login and OTP requests are cheap to send and expensive to serve (password
+hashing, OTP rows, email), so they are limited per client IP and per email
+or username before the view does any of that work. Each limit counts hits in
+fixed windows and weighs the previous window by how much of it still
+overlaps the sliding window, which smooths bursts at window edges without
+keeping a timestamp per request.
+
+Counts live in process memory by default. Set THROTTLE_BACKEND = 'cache' to
+share them between workers through the THROTTLE_CACHE cache alias.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+LOCAL_PRUNE_THRESHOLD = 50_000
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60); None disables the limit."""
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class LocalWindowStore:
+    """Per-process window counts: key -> (window index, current count, previous count, window length)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def _counts(self, key, index):
+        entry = self._windows.get(key)
+        if entry is None or entry[0] < index - 1:
+            return 0, 0
+        if entry[0] == index - 1:
+            return entry[1], 0
+        return entry[2], entry[1]
+
+    def hit(self, key, index, duration, allow):
+        with self._lock:
+            previous, current = self._counts(key, index)
+            if not allow(previous, current):
+                return previous, current, False
+            self._windows[key] = (index, current + 1, previous, duration)
+            if len(self._windows) > LOCAL_PRUNE_THRESHOLD:
+                self._prune()
+            return previous, current + 1, True
+
+    def _prune(self):
+        # Drop keys whose last window no longer overlaps the sliding window.
+        now = time.time()
+        self._windows = {
+            key: entry for key, entry in self._windows.items()
+            if (entry[0] + 2) * entry[3] > now
+        }
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+
+class CacheWindowStore:
+    """Window counts in a shared cache; checks and increments are not atomic, so limits are approximate."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, key, index, duration, allow):
+        current_key, previous_key = f'throttle:{key}:{index}', f'throttle:{key}:{index - 1}'
+        counts = self.cache.get_many([current_key, previous_key])
+        previous, current = counts.get(previous_key, 0), counts.get(current_key, 0)
+        if not allow(previous, current):
+            return previous, current, False
+        self.cache.add(current_key, 0, timeout=2 * duration)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add and incr; start the window again.
+            self.cache.set(current_key, 1, timeout=2 * duration)
+            current = 1
+        return previous, current, True
+
+
+_local_store = LocalWindowStore()
+
+
+def get_store():
+    if settings.THROTTLE_BACKEND == 'cache':
+        return CacheWindowStore(caches[settings.THROTTLE_CACHE])
+    return _local_store
+
+
+def reset_throttles():
+    """Forget every in-process count (for tests)."""
+    _local_store.clear()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Limits requests per `get_key` to the rate configured for `scope`."""
+    scope = None
+
+    def __init__(self):
+        self.limit, self.duration = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.scope))
+        self._wait = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if self.limit is None:
+            return True
+        ident = self.get_key(request, view)
+        if not ident:
+            return True
+
+        index, offset = divmod(time.time(), self.duration)
+        weight = 1 - offset / self.duration
+
+        def allow(previous, current):
+            return previous * weight + current < self.limit
+
+        previous, current, allowed = get_store().hit(f'{self.scope}:{ident}', int(index), self.duration, allow)
+        if not allowed:
+            self._wait = self.wait_for(previous, current, offset)
+        return allowed
+
+    def wait_for(self, previous, current, offset):
+        """Seconds until the weighted count drops below the limit again."""
+        if current >= self.limit or not previous:
+            return self.duration - offset
+        # previous * (1 - (offset + wait) / duration) + current < limit
+        return max(0.0, self.duration * (1 - (self.limit - current) / previous) - offset)
+
+    def wait(self):
+        return self._wait
+
+
+class IPThrottle(SlidingWindowThrottle):
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class FieldThrottle(SlidingWindowThrottle):
+    """Keys on a request body field, so one account can't be hammered from many IPs."""
+    field = None
+
+    def get_key(self, request, view):
+        value = request.data.get(self.field) if hasattr(request.data, 'get') else None
+        return str(value).strip().lower() if value else None
+
+
+class OTPIPThrottle(IPThrottle):
+    scope = 'otp_ip'
+
+
+class OTPEmailThrottle(FieldThrottle):
+    scope = 'otp_email'
+    field = 'email'
+
+
+class OTPVerifyEmailThrottle(FieldThrottle):
+    scope = 'otp_verify_email'
+    field = 'email'
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(FieldThrottle):
+    scope = 'login_username'
+    field = 'username'
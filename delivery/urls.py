@@ -1,10 +1,7 @@
 from django.urls import path, include
-from . import api_views
+from . import api_views, metrics, streams
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
 
 router = DefaultRouter()
 router.register(r'restaurants', api_views.RestaurantViewSet)
@@ -15,8 +12,10 @@ urlpatterns = [
     # API Routes
     path('api/', include(router.urls)),
     path('api/register/', api_views.RegisterView.as_view(), name='api_register'),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', api_views.ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/send-otp/', api_views.SendOTPView.as_view(), name='send_otp'),
     path('api/verify-otp/', api_views.VerifyOTPView.as_view(), name='verify_otp'),
+    path('api/events/orders/', streams.order_event_stream, name='order_events'),
+    path('metrics/', metrics.metrics_view, name='metrics'),
 ]
@@ -30,29 +30,92 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'delivery.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'delivery.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Trusted proxies in front of the app. With 0, throttles key on REMOTE_ADDR
+    # and ignore X-Forwarded-For, which any client can set to a fresh value.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Sliding-window limits for the login and OTP endpoints (see delivery.throttling).
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+        'login_username': config('THROTTLE_LOGIN_USERNAME', default='10/min'),
+        'otp_ip': config('THROTTLE_OTP_IP', default='30/hour'),
+        'otp_email': config('THROTTLE_OTP_EMAIL', default='5/hour'),
+        'otp_verify_email': config('THROTTLE_OTP_VERIFY_EMAIL', default='10/hour'),
+    },
+}
+
+SIMPLE_JWT = {
+    # Add the role and profile id claims that ClaimsJWTAuthentication trusts
+    # to access tokens, re-reading the profile on every refresh.
+    'TOKEN_OBTAIN_SERIALIZER': 'delivery.authentication.DeliveryTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'delivery.authentication.DeliveryTokenRefreshSerializer',
 }
 
+# Shared cache behind the catalog and profile lookups (see delivery.caching).
+# 'locmem' is private to each process; 'file' is shared by the processes on one
+# host; 'redis' talks to any Redis-protocol server at CACHE_LOCATION (Redis,
+# Valkey, or a local stand-in) and needs the `redis` package.
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHES = {
+    'default': {
+        'BACKEND': {
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+            'file': 'django.core.cache.backends.filebased.FileBasedCache',
+            'redis': 'django.core.cache.backends.redis.RedisCache',
+        }[CACHE_BACKEND],
+        'LOCATION': config('CACHE_LOCATION', default={
+            'locmem': 'delivery',
+            'file': str(BASE_DIR / 'cache'),
+            'redis': 'redis://127.0.0.1:6379/0',
+        }[CACHE_BACKEND]),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+    }
+}
+
+# 'local' keeps throttle counts per process; 'cache' shares them through THROTTLE_CACHE.
+THROTTLE_BACKEND = config('THROTTLE_BACKEND', default='local')
+THROTTLE_CACHE = config('THROTTLE_CACHE', default='default')
+
 from django.contrib.messages import constants as messages
 MESSAGE_TAGS = {
     messages.ERROR: 'danger',
 }
 
 MIDDLEWARE = [
+    'delivery.metrics.RequestMetricsMiddleware',
+    'delivery.slow_queries.SlowQueryLogMiddleware',
+    'delivery.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'delivery.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Clients allowed to scrape the Prometheus `metrics/` endpoint.
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1', cast=Csv())
+
+# Queries slower than this many milliseconds are written, with their EXPLAIN
+# plan, to SLOW_QUERY_LOG_FILE as NDJSON. 0 turns the slow query log off.
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=0, cast=float)
+SLOW_QUERY_LOG_FILE = config('SLOW_QUERY_LOG_FILE', default=str(BASE_DIR / 'slow_queries.ndjson'))
+
+# Staff requests sent with `X-Profile: 1` or `?profile=1` are profiled into this directory.
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_TOP_ALLOCATIONS = config('PROFILING_TOP_ALLOCATIONS', default=25, cast=int)
+
 ROOT_URLCONF = 'food_delivery_project.urls'
 
 TEMPLATES = [
@@ -98,6 +161,22 @@ else:
 
 
 
+# Read replicas for safe GET requests (see delivery.db_router): PostgreSQL
+# replica hosts sharing the primary's credentials, or, without PostgreSQL,
+# SQLite files standing in for replicas (copy db.sqlite3 over them to "replicate").
+if DB_NAME:
+    REPLICA_SETTINGS = [{**DATABASES['default'], 'HOST': host} for host in config('DB_REPLICA_HOSTS', default='', cast=Csv())]
+else:
+    REPLICA_SETTINGS = [{**DATABASES['default'], 'NAME': name} for name in config('DB_REPLICA_FILES', default='', cast=Csv())]
+READ_REPLICAS = []
+for number, replica in enumerate(REPLICA_SETTINGS, start=1):
+    # Tests run against the primary's test database through the replica alias.
+    DATABASES[f'replica{number}'] = {**replica, 'TEST': {'MIRROR': 'default'}}
+    READ_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['delivery.db_router.ReplicaRouter']
+# Seconds a client's reads stay on the primary after it writes.
+PRIMARY_PIN_SECONDS = config('PRIMARY_PIN_SECONDS', default=5, cast=int)
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {